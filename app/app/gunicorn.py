@@ -0,0 +1,125 @@
+"""
+Gunicorn config for serving the app project in production.
+
+Run it with ``gunicorn -c python:app.gunicorn app.wsgi``. Every setting can
+be overridden through the GUNICORN_* environment variables.
+"""
+import math
+import os
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+
+
+def cgroup_cpu_limit(root=CGROUP_ROOT):
+    """Return the cores allowed by the cgroup CPU quota, None if unlimited.
+
+    Reads cpu.max of cgroup v2, or cpu.cfs_quota_us and cpu.cfs_period_us
+    of cgroup v1.
+    """
+    try:
+        with open(os.path.join(root, 'cpu.max')) as file:
+            quota, period = file.read().split()
+    except (OSError, ValueError):
+        try:
+            with open(os.path.join(root, 'cpu', 'cpu.cfs_quota_us')) as file:
+                quota = file.read().strip()
+            with open(os.path.join(root, 'cpu', 'cpu.cfs_period_us')) as file:
+                period = file.read().strip()
+        except OSError:
+            return None
+    try:
+        quota, period = int(quota), int(period)
+    except ValueError:
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return max(1, math.ceil(quota / period))
+
+
+def available_cpus():
+    """Return the cores this process may run on.
+
+    Counts the CPUs of its affinity mask, capped by the cgroup quota that
+    containers are usually limited with.
+    """
+    cpus = len(os.sched_getaffinity(0))
+    limit = cgroup_cpu_limit()
+    return cpus if limit is None else min(cpus, limit)
+
+
+def default_workers(cpu_count):
+    """Return the number of workers for cpu_count cores."""
+    return cpu_count * 2 + 1
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = 'gthread'
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS', default_workers(available_cpus())))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import Django once in the master so workers share its memory pages.
+preload_app = os.environ.get(
+    'GUNICORN_PRELOAD', 'true').lower() in ('1', 'true')
+
+# Recycle workers to bound memory growth, jittered so they don't all
+# restart at once.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def pre_fork(server, worker):
+    """Close database connections of the master before forking a worker.
+
+    Workers would otherwise inherit and share the master's sockets. Without
+    preload_app the master never loads Django and has none to close.
+    """
+    from django.conf import settings
+    if not settings.configured:
+        return
+    from django.db import connections
+    from core.db.backends.postgresql.base import close_pools
+    connections.close_all()
+    close_pools()
+
+
+def on_starting(server):
+    """Check the caches are shared and remove metrics files of earlier runs.
+
+    Cache invalidations of one worker only reach the others through the
+    shared cache at CACHE_LOCATION.
+    """
+    if server.cfg.workers > 1 and not os.environ.get('CACHE_LOCATION'):
+        raise RuntimeError('several workers need a shared cache, set '
+                           'CACHE_LOCATION or GUNICORN_WORKERS=1')
+    if os.environ.get('METRICS_DIR'):
+        from core.metrics import clear_directory
+        os.makedirs(os.environ['METRICS_DIR'], exist_ok=True)
+        clear_directory(os.environ['METRICS_DIR'])
+
+
+def post_worker_init(worker):
+    """Resume the provisioning jobs left pending by exited processes."""
+    from contract.jobs import resume_pending_jobs
+    resume_pending_jobs()
+
+
+def worker_exit(server, worker):
+    """Write the final metrics of an exiting worker."""
+    if os.environ.get('METRICS_DIR'):
+        from core.metrics import registry
+        registry.flush()
+
+
+def child_exit(server, worker):
+    """Keep the counters of an exited worker in the metrics archive."""
+    if os.environ.get('METRICS_DIR'):
+        from core.metrics import archive_process
+        archive_process(os.environ['METRICS_DIR'], worker.pid)
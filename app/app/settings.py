@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
     'core',
     'user',
     'contract',
+    'telemetry',
 
     #third-aparty
     'rest_framework',
@@ -47,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,6 +61,135 @@ MIDDLEWARE = [
 
 REST_FRAMEWORK = {
     'NON_FIELD_ERRORS_KEY': 'errors',
+    # Same output as the DRF JSON classes, faster with orjson installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Default page sizes of the cursor paginated contract APIs.
+CONTRACT_PAGE_SIZE = int(os.environ.get('CONTRACT_PAGE_SIZE', 10))
+GARDEN_PAGE_SIZE = int(os.environ.get('GARDEN_PAGE_SIZE', 100))
+PLANT_PAGE_SIZE = int(os.environ.get('PLANT_PAGE_SIZE', 100))
+
+# Rollout of Plant.garden: while enabled, writes keep the legacy string
+# column in sync and the API renders garden_id as a string like before.
+PLANT_GARDEN_ID_COMPAT = os.environ.get(
+    'PLANT_GARDEN_ID_COMPAT', 'true').lower() == 'true'
+
+# Render read only contract, garden and plant responses from values() rows
+# instead of DRF serializers. The output is the same; turn it off to fall
+# back to the serializers.
+FAST_SERIALIZERS = os.environ.get(
+    'FAST_SERIALIZERS', 'true').lower() == 'true'
+
+# Provision new contracts on a background thread pool and answer the
+# POST with 202 and a job that can be polled for status.
+CONTRACT_PROVISIONING_ASYNC = os.environ.get(
+    'CONTRACT_PROVISIONING_ASYNC', 'false').lower() == 'true'
+CONTRACT_PROVISIONING_WORKERS = int(os.environ.get(
+    'CONTRACT_PROVISIONING_WORKERS', 2))
+# Seconds after which a running job is taken to be left by a killed
+# process, and run again when a server starts.
+CONTRACT_PROVISIONING_STALE_AFTER = int(os.environ.get(
+    'CONTRACT_PROVISIONING_STALE_AFTER', 600))
+
+# Seconds the latest plant values wait for more readings before the
+# background update runs.
+TELEMETRY_FLUSH_DELAY = float(os.environ.get('TELEMETRY_FLUSH_DELAY', 0.5))
+
+# Memcached at CACHE_LOCATION (host:port) is shared by all processes, so
+# an invalidation in one process reaches the others. Without it every
+# process has its own memory cache, which only suits a single process;
+# the gunicorn profile refuses to start several workers that way.
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION', '')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_LOCATION,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# Cache of serialized contract trees, kept in the shared cache by default.
+CONTRACT_CACHE = {
+    'BACKEND': os.environ.get('CONTRACT_CACHE_BACKEND',
+                              'contract.cache.DjangoCacheBackend'),
+    'TIMEOUT': int(os.environ.get('CONTRACT_CACHE_TIMEOUT', 60)),
+}
+if CONTRACT_CACHE['BACKEND'] == 'core.cache.LRUCacheBackend':
+    # Keeps them in process, which is only safe with a single process.
+    CONTRACT_CACHE['MAX_ENTRIES'] = int(
+        os.environ.get('CONTRACT_CACHE_MAX_ENTRIES', 1024))
+else:
+    CONTRACT_CACHE['CACHE_ALIAS'] = os.environ.get('CONTRACT_CACHE_ALIAS',
+                                                   'default')
+
+# Cache of token lookups done by CachedTokenAuthentication, kept in the
+# shared cache with per-user generations so every process sees token
+# deletion and user changes right away.
+TOKEN_AUTH_CACHE = {
+    'TIMEOUT': int(os.environ.get('TOKEN_AUTH_CACHE_TIMEOUT', 60)),
+    'CACHE_ALIAS': os.environ.get('TOKEN_AUTH_CACHE_ALIAS', 'default'),
+}
+
+# Request instrumentation. A SAMPLE_RATE share of requests records SQL,
+# auth, serializer and render time. Any request over a budget is logged
+# as a warning.
+INSTRUMENTATION = {
+    'SAMPLE_RATE': float(os.environ.get('INSTRUMENTATION_SAMPLE_RATE', 0.1)),
+    'QUERY_BUDGET': int(os.environ.get('INSTRUMENTATION_QUERY_BUDGET', 50)),
+    'LATENCY_BUDGET_MS': float(os.environ.get(
+        'INSTRUMENTATION_LATENCY_BUDGET_MS', 1000)),
+}
+
+# Directory shared by the workers of a multi-process server to merge their
+# metrics, flushed every METRICS_FLUSH_INTERVAL seconds.
+METRICS_DIR = os.environ.get('METRICS_DIR') or None
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+# /metrics answers requests from METRICS_ALLOWED_IPS, and from anywhere with
+# "Authorization: Bearer <METRICS_TOKEN>" when a token is set.
+METRICS_ALLOWED_IPS = [
+    address.strip() for address in os.environ.get(
+        'METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+    if address.strip()
+]
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+
+# Tests check the instrumentation logs they need with assertLogs, the
+# warnings of slow test requests are dropped.
+TESTING = sys.argv[1:2] == ['test']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'null': {
+            'class': 'logging.NullHandler',
+        },
+    },
+    'loggers': {
+        'core.instrumentation': {
+            'handlers': ['null' if TESTING else 'console'],
+            'level': os.environ.get('INSTRUMENTATION_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
 }
 
 ROOT_URLCONF = 'app.urls'
@@ -86,14 +218,37 @@ WSGI_APPLICATION = 'app.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.backends.postgresql',
         'HOST' : os.environ.get('DB_HOST'),
         'NAME' : os.environ.get('DB_NAME'),
         'USER' : os.environ.get('DB_USER'),
-        'PASSWORD' : os.environ.get("DB_PASS")
+        'PASSWORD' : os.environ.get("DB_PASS"),
+        # Keep connections open between requests, checking them before
+        # their first use in a request.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.environ.get(
+            'DB_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true'),
+        # Behind PgBouncer in transaction pooling mode a server side
+        # cursor cannot outlive its transaction.
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get(
+            'DB_PGBOUNCER', 'false').lower() in ('1', 'true'),
     }
 }
 
+# Optional pool limiting the connections of each process. Connections go
+# back to the pool at the end of every request instead of staying open.
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 0))
+if DB_POOL_MAX_SIZE:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['POOL'] = {
+        'MAX_SIZE': DB_POOL_MAX_SIZE,
+        'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }
+
+# Requests served at once by the ASGI handler, each on a thread of its own.
+# Further requests wait for one of them to finish.
+ASGI_MAX_THREADS = int(os.environ.get('ASGI_MAX_THREADS', 40))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -16,9 +16,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import metrics
+
 version = 'v1/'
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path(f'{version}api/user/', include('user.urls')),
     path(f'{version}api/contract/', include('contract.urls')),
+    path(f'{version}api/telemetry/', include('telemetry.urls')),
 ]
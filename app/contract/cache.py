@@ -0,0 +1,143 @@
+"""
+Read cache for serialized contract trees.
+"""
+import hashlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from core.metrics import Callback
+
+
+class DjangoCacheBackend:
+    """Cache stored in one of the configured Django caches."""
+
+    def __init__(self, timeout, cache_alias='default'):
+        self.timeout = timeout
+        self.cache = caches[cache_alias]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class ContractCache:
+    """Cache of contract payloads keyed by user and contract.
+
+    Every key embeds a per-user generation token, so invalidating a user
+    replaces the token and orphans all of the user's entries at once.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            options = {key.lower(): value
+                       for key, value in settings.CONTRACT_CACHE.items()}
+            backend_path = options.pop('backend')
+            backend_class = import_string(backend_path)
+            try:
+                self._backend = backend_class(**options)
+            except TypeError as error:
+                raise ImproperlyConfigured(
+                    f'Invalid CONTRACT_CACHE for {backend_path}: {error}'
+                ) from error
+        return self._backend
+
+    def reset(self):
+        """Drop the backend and counters so settings are read again."""
+        self._backend = None
+        self.hits = 0
+        self.misses = 0
+
+    def _generation_key(self, user_id):
+        return f'contract-cache:{user_id}:generation'
+
+    def _generation(self, user_id):
+        key = self._generation_key(user_id)
+        generation = self.backend.get(key)
+        if generation is None:
+            generation = uuid.uuid4().hex
+            self.backend.set(key, generation)
+        return generation
+
+    def make_key(self, user_id, *parts):
+        """Return cache key of payload for user identified by parts.
+
+        Parts are hashed, URLs among them may be longer than or contain
+        characters memcached keys cannot.
+        """
+        generation = self._generation(user_id)
+        digest = hashlib.sha1(
+            ':'.join(str(part) for part in parts).encode()).hexdigest()
+        return f'contract-cache:{user_id}:{generation}:{digest}'
+
+    def get(self, key):
+        """Return cached payload for key or None, counting hits/misses."""
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def invalidate_user(self, user_id):
+        """Invalidate cached payloads of user, now and on commit."""
+        if user_id is None:
+            return
+        key = self._generation_key(user_id)
+        self.backend.delete(key)
+        transaction.on_commit(lambda: self.backend.delete(key))
+
+    def stats(self):
+        """Return hit and miss counters."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0,
+        }
+
+
+contract_cache = ContractCache()
+
+
+def cache_requests():
+    stats = contract_cache.stats()
+    return {('hit',): stats['hits'], ('miss',): stats['misses']}
+
+
+Callback('contract_cache_requests', 'Contract cache lookups by result.',
+         ['result'], cache_requests, kind='counter')
+
+
+@receiver(setting_changed)
+def reset_contract_cache(setting, **kwargs):
+    if setting == 'CONTRACT_CACHE':
+        contract_cache.reset()
@@ -0,0 +1,71 @@
+"""
+Conditional GET of contract resources from their versions.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import (
+    Count,
+    Max,
+    Sum,
+)
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+)
+from django.utils.http import http_date
+
+from rest_framework import status
+
+
+def make_etag(*parts):
+    """Return a weak ETag identifying parts."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16)
+    return f'W/"{digest.hexdigest()}"'
+
+
+class ConditionalGetMixin:
+    """Answer reads of unchanged resources with 304 Not Modified.
+
+    The ETag hashes the versions of the requested rows, read with one
+    query by get_validators(), and the URL, format and id compat setting,
+    so it is known without serializing. Details also send their updated_at
+    as Last-Modified; lists do not, a deleted row would not move it.
+    """
+
+    def get_validators(self):
+        """Return versions and modification time of the resource or None."""
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == 'list':
+            summary = queryset.aggregate(
+                count=Count('id'), version=Sum('version'),
+                updated_at=Max('updated_at'))
+            return tuple(summary.values()), None
+        try:
+            row = queryset.filter(pk=self.kwargs['pk']).values_list(
+                'version', 'updated_at').first()
+        except (TypeError, ValueError, ValidationError):
+            return None
+        return None if row is None else (row, row[1])
+
+    def conditional_response(self, validators, get_response):
+        """Return 304 if the request matches validators or get_response()."""
+        if validators is None:
+            return get_response()
+        versions, last_modified = validators
+        etag = make_etag(versions, self.request.get_full_path(),
+                         self.request.accepted_renderer.format,
+                         settings.PLANT_GARDEN_ID_COMPAT)
+        timestamp = last_modified and int(last_modified.timestamp())
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = get_response()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if timestamp:
+            response['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,58 @@
+"""
+Query parameter filters for the contract APIs.
+"""
+import math
+import uuid
+
+from rest_framework import serializers
+
+from core.models import PLANT_MEASURED_FIELDS
+
+RANGE_LOOKUPS = ['lt', 'lte', 'gt', 'gte']
+BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+
+
+def parse_value(name, value, parse):
+    """Return value parsed by parse, rejecting it with a 400 if invalid."""
+    try:
+        return parse(value)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({name: [f'invalid value {value!r}']})
+
+
+def parse_boolean(value):
+    try:
+        return BOOLEAN_VALUES[value.lower()]
+    except KeyError:
+        raise ValueError(value)
+
+
+def parse_number(value):
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(value)
+    return number
+
+
+def filter_plants(queryset, params):
+    """Return plants of queryset matching the query parameters.
+
+    Supports `garden`, `contract`, `has_plant` and `<metric>__<lookup>`
+    ranges such as `health__lt` or `disease__gte`.
+    """
+    filters = {}
+    if 'garden' in params:
+        filters['garden_id'] = parse_value('garden', params['garden'], int)
+    if 'contract' in params:
+        filters['garden__contract'] = parse_value(
+            'contract', params['contract'], uuid.UUID)
+    if 'has_plant' in params:
+        filters['has_plant'] = parse_value(
+            'has_plant', params['has_plant'], parse_boolean)
+    for field in PLANT_MEASURED_FIELDS:
+        for lookup in RANGE_LOOKUPS:
+            name = f'{field}__{lookup}'
+            if name in params:
+                filters[name] = parse_value(name, params[name],
+                                            parse_number)
+    return queryset.filter(**filters) if filters else queryset
@@ -0,0 +1,114 @@
+"""
+Background execution of contract provisioning jobs.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import (
+    DatabaseError,
+    connection,
+    transaction,
+)
+from django.utils import timezone
+
+from core.models import (
+    Contract,
+    ProvisioningJob,
+)
+
+from contract.provisioning import provision_contract
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process wide provisioning executor."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CONTRACT_PROVISIONING_WORKERS,
+                thread_name_prefix='provisioning',
+            )
+    return _executor
+
+
+def run_provisioning_job(job_id):
+    """Provision the contract of job and record the outcome on the job.
+
+    Only pending jobs are run, so a job resumed by several processes runs
+    once. The contract of a failed job is deleted, which frees its name
+    for a retry, and the error is logged.
+    """
+    try:
+        claimed = ProvisioningJob.objects.filter(
+            id=job_id, status=ProvisioningJob.Status.PENDING).update(
+            status=ProvisioningJob.Status.RUNNING,
+            started_at=timezone.now(),
+        )
+        if not claimed:
+            return
+        job = ProvisioningJob.objects.select_related(
+            'contract__user').get(id=job_id)
+        try:
+            provision_contract(job.contract)
+        except Exception as error:
+            with transaction.atomic():
+                ProvisioningJob.objects.filter(id=job.id).update(
+                    status=ProvisioningJob.Status.FAILED,
+                    error=str(error),
+                    finished_at=timezone.now(),
+                )
+                Contract.objects.filter(id=job.contract_id).delete()
+            logger.exception('provisioning job %s failed', job.id)
+            return
+        ProvisioningJob.objects.filter(id=job.id).update(
+            status=ProvisioningJob.Status.DONE,
+            finished_at=timezone.now(),
+        )
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connection.close()
+
+
+def enqueue_provisioning_job(job):
+    """Schedule job on the executor once the current transaction commits."""
+    transaction.on_commit(
+        lambda: get_executor().submit(run_provisioning_job, job.id))
+
+
+def resume_pending_jobs():
+    """Schedule the pending jobs left by processes that exited.
+
+    Called by the servers when a process starts serving. Jobs still queued
+    in a live process are only run by one of them. Jobs running for longer
+    than CONTRACT_PROVISIONING_STALE_AFTER seconds were left by a killed
+    process and are run again; provisioning is atomic, so they left no
+    gardens behind.
+    """
+    stale_before = timezone.now() - timedelta(
+        seconds=settings.CONTRACT_PROVISIONING_STALE_AFTER)
+    try:
+        ProvisioningJob.objects.filter(
+            status=ProvisioningJob.Status.RUNNING,
+            started_at__lt=stale_before).update(
+            status=ProvisioningJob.Status.PENDING, started_at=None)
+        job_ids = list(ProvisioningJob.objects.filter(
+            status=ProvisioningJob.Status.PENDING).values_list(
+            'id', flat=True))
+    except DatabaseError:
+        logger.exception('reading pending provisioning jobs failed')
+        return
+    finally:
+        # The connection of the starting thread is not used again.
+        if not connection.in_atomic_block:
+            connection.close()
+    executor = get_executor()
+    for job_id in job_ids:
+        executor.submit(run_provisioning_job, job_id)
@@ -0,0 +1,44 @@
+"""
+Pagination for the contract APIs.
+"""
+from django.conf import settings
+
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class ResultCursorPagination(CursorPagination):
+    """Cursor pagination keeping the results under the `result` key."""
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'result': data,
+        })
+
+
+class ContractPagination(ResultCursorPagination):
+    """Paginate contracts on their primary key."""
+    ordering = '-id'
+    page_size = settings.CONTRACT_PAGE_SIZE
+
+
+class GardenPagination(ResultCursorPagination):
+    """Paginate gardens on their name, ordering ties by primary key.
+
+    The cursor only holds a name and an offset into the gardens sharing
+    it, DRF positions on the first ordering field. Pages stay correct, but
+    a run of equal names is skipped by offset, so pages deep inside a long
+    run read every garden of the run before them.
+    """
+    ordering = ('-name', '-id')
+    page_size = settings.GARDEN_PAGE_SIZE
+
+
+class PlantPagination(ResultCursorPagination):
+    """Paginate plants on their primary key."""
+    ordering = '-id'
+    page_size = settings.PLANT_PAGE_SIZE
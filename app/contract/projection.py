@@ -0,0 +1,145 @@
+"""
+Sparse fieldsets for the contract APIs.
+
+`?fields=id,gardens.name` keeps only the listed fields, dotted paths
+selecting the fields of nested levels. `?expand=gardens` keeps only the
+listed nested levels, so `?expand=` drops all of them. Naming a nested
+field in `fields` expands it.
+"""
+import json
+
+from rest_framework import serializers
+
+
+def parse_paths(name, value):
+    """Return the comma separated dotted paths of value as a tree."""
+    tree = {}
+    for path in filter(None, (path.strip() for path in value.split(','))):
+        node = tree
+        for part in path.split('.'):
+            if not part:
+                raise serializers.ValidationError(
+                    {name: [f'invalid path {path!r}']})
+            node = node.setdefault(part, {})
+    return tree
+
+
+class Projection:
+    """Fields and nested levels selected at one level of a response.
+
+    None selects everything, a tree selects the names it lists.
+    """
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_params(cls, params):
+        """Return projection of query params, None if there is none."""
+        if 'fields' not in params and 'expand' not in params:
+            return None
+        return cls(
+            parse_paths('fields', params['fields'])
+            if 'fields' in params else None,
+            parse_paths('expand', params['expand'])
+            if 'expand' in params else None,
+        )
+
+    @property
+    def key(self):
+        """Return a string identifying the projection in cache keys."""
+        return json.dumps([self.fields, self.expand], sort_keys=True)
+
+    def child(self, name):
+        """Return projection of the nested level name."""
+        fields = None
+        if self.fields is not None:
+            fields = self.fields.get(name) or None
+        expand = None
+        if self.expand is not None:
+            expand = self.expand.get(name, {})
+        return Projection(fields, expand)
+
+    def lists(self, name):
+        """Return whether fields or expand name the field explicitly."""
+        return name in (self.fields or ()) or name in (self.expand or ())
+
+    def is_selected(self, name, nested):
+        if self.fields is not None and name not in self.fields:
+            return False
+        if not nested or self.expand is None or name in self.expand:
+            return True
+        return self.fields is not None
+
+    def select(self, fields):
+        """Return the selected fields of the serializer fields dict."""
+        nested = {name for name, field in fields.items()
+                  if isinstance(field, serializers.BaseSerializer)}
+        for param, names, known in (('fields', self.fields, fields),
+                                    ('expand', self.expand, nested)):
+            unknown = sorted(set(names or ()) - set(known))
+            if unknown:
+                raise serializers.ValidationError(
+                    {param: [f'unknown fields: {", ".join(unknown)}']})
+        return {name: field for name, field in fields.items()
+                if self.is_selected(name, name in nested)}
+
+
+class ProjectedSerializerMixin:
+    """Serializer keeping the fields selected by the `projection` context.
+
+    Nested serializers look up their level by the field names leading to
+    them.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        projection = self.context.get('projection')
+        if projection is None:
+            return fields
+        path = []
+        node = self
+        while node is not None:
+            if node.field_name:
+                path.append(node.field_name)
+            node = node.parent
+        for name in reversed(path):
+            projection = projection.child(name)
+        return projection.select(fields)
+
+
+class ProjectedViewMixin:
+    """View passing the projection of GET requests to its serializers."""
+
+    def get_projection(self):
+        """Return projection of the request, None if it has none."""
+        if self.request.method != 'GET':
+            return None
+        if not hasattr(self, '_projection'):
+            self._projection = Projection.from_params(
+                self.request.query_params)
+        return self._projection
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['projection'] = self.get_projection()
+        return context
+
+
+def projected_columns(serializer, *always):
+    """Return the model fields read by the flat fields of serializer.
+
+    The primary key and the fields in always are included regardless.
+    """
+    serializer = getattr(serializer, 'child', serializer)
+    opts = serializer.Meta.model._meta
+    concrete = {field.name for field in opts.concrete_fields}
+    columns = {opts.pk.name, *always}
+    for field in serializer.fields.values():
+        if isinstance(field, serializers.BaseSerializer):
+            continue
+        source = field.source.split('.')[0]
+        if source in concrete:
+            columns.add(source)
+    return sorted(columns)
@@ -0,0 +1,76 @@
+"""
+Provisioning of the garden/plant tree for new contracts.
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from core.models import (
+    Contract,
+    Garden,
+    Plant,
+    legacy_garden_id,
+)
+from core.metrics import Histogram
+
+from contract.cache import contract_cache
+from contract.versions import touch_contracts
+
+GARDENS_PER_LEVEL = 10
+PLANTS_PER_LEVEL = 10
+NEW_PLANT_NAME = 'newplant'
+
+PROVISIONING_DURATION = Histogram(
+    'contract_provisioning_seconds',
+    'Time spent creating the gardens and plants of a contract by level.',
+    ['level'],
+)
+
+
+def provision_contract(contract):
+    """Create gardens and plants for contract in a constant number of queries.
+
+    Every statement is a bulk insert, so the query count does not depend on
+    the contract level. Relies on the backend returning primary keys from
+    bulk inserts (PostgreSQL). Bulk inserts send no model signals, so the
+    cached trees of the owner are invalidated and the contract version is
+    advanced here.
+    """
+    started = time.perf_counter()
+    with transaction.atomic():
+        gardens = Garden.objects.bulk_create([
+            Garden(user=contract.user,
+                   name=contract.name,
+                   level=contract.level)
+            for _ in range(contract.level * GARDENS_PER_LEVEL)
+        ])
+
+        compat = settings.PLANT_GARDEN_ID_COMPAT
+        plants = Plant.objects.bulk_create([
+            Plant(garden=garden,
+                  legacy_garden_id=legacy_garden_id(garden.id)
+                  if compat else '',
+                  user=garden.user,
+                  name=NEW_PLANT_NAME)
+            for garden in gardens
+            for _ in range(garden.level * PLANTS_PER_LEVEL)
+        ])
+
+        GardenPlant = Garden.plants.through
+        GardenPlant.objects.bulk_create([
+            GardenPlant(garden_id=plant.garden_id, plant_id=plant.id)
+            for plant in plants
+        ])
+
+        ContractGarden = Contract.gardens.through
+        ContractGarden.objects.bulk_create([
+            ContractGarden(contract_id=contract.id, garden_id=garden.id)
+            for garden in gardens
+        ])
+        touch_contracts({contract.id})
+        contract_cache.invalidate_user(contract.user_id)
+
+    PROVISIONING_DURATION.observe(time.perf_counter() - started,
+                                  contract.level)
+    return gardens
@@ -0,0 +1,161 @@
+"""
+Read only serialization of values() rows.
+
+RowSerializer compiles a serializer, after projection, into a converter
+per field and builds the same output from values() rows without model
+instances or DRF field calls, loading each nested level with one query.
+Serializers with fields it cannot compile are left to DRF.
+"""
+from django.conf import settings
+from django.db.models import F
+
+from rest_framework import serializers
+from rest_framework.generics import get_object_or_404
+from rest_framework.relations import PKOnlyObject
+from rest_framework.response import Response
+
+from core.instrumentation import span
+
+# Field classes whose to_representation is exactly these functions.
+CONVERTERS = {
+    serializers.CharField: str,
+    serializers.IntegerField: int,
+    serializers.FloatField: float,
+}
+PARENT = '_parent'
+
+
+class Unsupported(Exception):
+    """Serializer has fields RowSerializer cannot compile."""
+
+
+def compile_field(field):
+    """Return function converting a column value like field does."""
+    converter = CONVERTERS.get(type(field))
+    if converter is not None:
+        return converter
+    if (isinstance(field, serializers.PrimaryKeyRelatedField) and
+            field.pk_field is None):
+        return lambda value: field.to_representation(PKOnlyObject(value))
+    raise Unsupported(field)
+
+
+def relation_lookup(model, accessor):
+    """Return lookup from the related model back to model of accessor."""
+    for field in model._meta.get_fields():
+        if not (field.many_to_many or field.one_to_many):
+            continue
+        if field.concrete:
+            if field.name == accessor:
+                return field.related_query_name()
+        elif field.get_accessor_name() == accessor:
+            return field.field.name
+    raise Unsupported(accessor)
+
+
+class RowSerializer:
+    """Read only serializer of values() rows compiled from serializer."""
+
+    def __init__(self, serializer):
+        serializer = getattr(serializer, 'child', serializer)
+        self.model = serializer.Meta.model
+        opts = self.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+        self.pk = opts.pk.name
+        # (name, source, converter), converter None for nested levels.
+        self.fields = []
+        self.nested = {}
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if len(field.source_attrs) != 1:
+                raise Unsupported(field)
+            if isinstance(field, serializers.ListSerializer):
+                self.nested[name] = (
+                    relation_lookup(self.model, field.source),
+                    RowSerializer(field.child))
+                self.fields.append((name, name, None))
+            elif isinstance(field, serializers.BaseSerializer) or \
+                    field.source not in concrete:
+                raise Unsupported(field)
+            else:
+                self.fields.append((name, field.source, compile_field(field)))
+        self.columns = sorted({self.pk} | {
+            source for _, source, converter in self.fields if converter})
+
+    def values(self, queryset, *always, **expressions):
+        """Return queryset as rows of the columns this serializer reads."""
+        columns = self.columns + [column for column in always
+                                  if column not in self.columns]
+        return queryset.prefetch_related(None).values(
+            *columns, **expressions)
+
+    def serialize(self, rows):
+        """Return the output of rows, loading their nested levels."""
+        rows = list(rows)
+        children = {}
+        if rows and self.nested:
+            ids = [row[self.pk] for row in rows]
+            for name, (lookup, child) in self.nested.items():
+                child_rows = list(child.values(
+                    child.model._default_manager.filter(
+                        **{f'{lookup}__in': ids}),
+                    **{PARENT: F(lookup)}))
+                grouped = children[name] = {}
+                for row, item in zip(child_rows, child.serialize(child_rows)):
+                    grouped.setdefault(row[PARENT], []).append(item)
+
+        result = []
+        with span('serialize'):
+            for row in rows:
+                item = {}
+                for name, source, converter in self.fields:
+                    if converter is None:
+                        item[name] = children[name].get(row[self.pk], [])
+                    else:
+                        value = row[source]
+                        item[name] = (None if value is None
+                                      else converter(value))
+                result.append(item)
+        return result
+
+
+def row_serializer(serializer):
+    """Return RowSerializer of serializer, None to render with DRF."""
+    if not settings.FAST_SERIALIZERS:
+        return None
+    try:
+        return RowSerializer(serializer)
+    except Unsupported:
+        return None
+
+
+class RowSerializerMixin:
+    """Read views listing and retrieving through RowSerializer."""
+
+    # Columns read besides the serialized ones, like pagination ordering.
+    row_columns = ()
+
+    def get_row_serializer(self):
+        """Return row serializer of the request, None to use DRF."""
+        return row_serializer(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        rows = self.get_row_serializer()
+        if rows is None:
+            return super().list(request, *args, **kwargs)
+        queryset = rows.values(self.filter_queryset(self.get_queryset()),
+                               *self.row_columns)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(rows.serialize(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        rows = self.get_row_serializer()
+        if rows is None:
+            return super().retrieve(request, *args, **kwargs)
+        queryset = rows.values(self.filter_queryset(self.get_queryset()))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(request, row)
+        return Response(rows.serialize([row])[0])
@@ -1,34 +1,159 @@
 """
 Serializers for contract APIs.
 """
+import math
+
+from django.conf import settings
+from django.db import (
+    IntegrityError,
+    models,
+    transaction,
+)
+from django.utils import timezone
+
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from core.models import (
+    PLANT_METRIC_FIELDS,
     Contract,
     Garden,
     Plant,
+    ProvisioningJob,
+    legacy_garden_id,
 )
+from core.instrumentation import (
+    TimedListSerializer,
+    TimedSerializerMixin,
+)
+
+from contract.cache import contract_cache
+from contract.projection import ProjectedSerializerMixin
+from contract.provisioning import provision_contract
+
+CONTRACT_NAME_INDEX = 'contract_user_lower_name_uniq'
+BULK_UPDATE_MAX_PLANTS = 10000
+BULK_UPDATE_BATCH_SIZE = 1000
+
+
+class GardenIdField(serializers.PrimaryKeyRelatedField):
+    """Garden of a plant, limited to gardens of the requesting user."""
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return Garden.objects.none()
+        return Garden.objects.filter(user=request.user)
+
+    def to_representation(self, value):
+        garden_id = super().to_representation(value)
+        if settings.PLANT_GARDEN_ID_COMPAT:
+            return legacy_garden_id(garden_id)
+        return garden_id
 
 
-class PlantSerializer(serializers.ModelSerializer):
+class PlantSerializer(TimedSerializerMixin, ProjectedSerializerMixin,
+                      serializers.ModelSerializer):
     """Serializer for plants."""
 
+    garden_id = GardenIdField(source='garden', required=False,
+                              allow_null=True)
+
     class Meta:
         model = Plant
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'garden_id', 'name']
 
 
-class GardenSerializer(serializers.ModelSerializer):
+class FiniteFloatField(serializers.FloatField):
+    """Float field rejecting NaN and infinities."""
+
+    default_error_messages = {
+        'not_finite': 'A finite number is required.',
+    }
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        if not math.isfinite(value):
+            self.fail('not_finite')
+        return value
+
+
+class PlantMetricsSerializer(serializers.ModelSerializer):
+    """Serializer for the metrics of one plant in a bulk update."""
+
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FloatField: FiniteFloatField,
+    }
+
+    id = serializers.IntegerField()
+
+    class Meta:
+        model = Plant
+        fields = ('id',) + PLANT_METRIC_FIELDS
+        extra_kwargs = {field: {'required': False}
+                        for field in PLANT_METRIC_FIELDS}
+
+
+class PlantBulkUpdateSerializer(serializers.Serializer):
+    """Serializer for updating the metrics of many plants at once."""
+
+    plants = PlantMetricsSerializer(many=True, allow_empty=False)
+
+    def validate_plants(self, value):
+        """Validate the batch size and that every plant is listed once."""
+        if len(value) > BULK_UPDATE_MAX_PLANTS:
+            raise serializers.ValidationError(
+                f'at most {BULK_UPDATE_MAX_PLANTS} plants per request')
+        ids = [record['id'] for record in value]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError('duplicate plant ids')
+        return value
+
+    def create(self, validated_data):
+        """Apply the metrics to plants owned by user with bulk updates."""
+        user = validated_data['user']
+        records = {record.pop('id'): record
+                   for record in validated_data['plants']}
+        fields = {field for record in records.values() for field in record}
+
+        with transaction.atomic():
+            plants = list(Plant.objects.select_for_update().filter(
+                user=user, id__in=records).only('id', *fields))
+            missing = set(records) - {plant.id for plant in plants}
+            if missing:
+                raise serializers.ValidationError(
+                    {'plants': [f'plants not found: {sorted(missing)}']})
+
+            now = timezone.now()
+            for plant in plants:
+                for field, value in records[plant.id].items():
+                    setattr(plant, field, value)
+                plant.updated_at = now
+            if fields:
+                Plant.objects.bulk_update(plants,
+                                          sorted(fields) + ['updated_at'],
+                                          batch_size=BULK_UPDATE_BATCH_SIZE)
+            contract_cache.invalidate_user(user.id)
+
+        return plants
+
+
+class GardenSerializer(TimedSerializerMixin, ProjectedSerializerMixin,
+                       serializers.ModelSerializer):
     """Serialier for gardens."""
 
-    plants = PlantSerializer(many=True, required=False)
+    plants = PlantSerializer(many=True, read_only=True, source='plant_set')
 
     class Meta:
         model = Garden
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'name', 'level', 'plants']
         read_only_fields = ['id']
 
 
-class ContractSerializer(serializers.ModelSerializer):
+class ContractSerializer(TimedSerializerMixin, ProjectedSerializerMixin,
+                         serializers.ModelSerializer):
     """Serializer for contracts."""
 
     id = serializers.CharField(read_only=True)
@@ -36,45 +161,50 @@ class ContractSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Contract
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'name', 'level', 'gardens']
         read_only_fields = ['id']
 
     def create(self, validated_data):
-        """Create contract."""
-        contract = Contract.objects.create(**validated_data)
-        auth_user = self.context['request'].user
-        for level in range(contract.level * 10):
-            garden = Garden.objects.create(user=auth_user,
-                                           name=contract.name,
-                                           level=contract.level)
-            for i in range(garden.level * 10):
-                plant = Plant.objects.create(
-                    garden_id=garden.id,
-                    user=garden.user,
-                    name='newplant',
-                )
-                garden.plants.add(plant)
-
-            contract.gardens.add(garden)
+        """Create contract with its gardens and plants.
+
+        Names are unique per user ignoring case, which is enforced by the
+        CONTRACT_NAME_INDEX unique index rather than by a query up front.
+        """
+        provision = validated_data.pop('provision', True)
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    contract = Contract.objects.create(**validated_data)
+            except IntegrityError as error:
+                diag = getattr(error.__cause__, 'diag', None)
+                if (getattr(diag, 'constraint_name', None) !=
+                        CONTRACT_NAME_INDEX):
+                    raise
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'contract with name already exists'],
+                })
+            if provision:
+                provision_contract(contract)
 
         return contract
 
-    def validate(self, attrs):
-        """Validate if contract already exist."""
-        if self.context['request'].method == 'POST':
-            current_user_email = self.context['request'].user.email
-            check_contract_user = Contract.objects.filter(
-                user__email=current_user_email).filter(
-                    name=attrs['name'].lower()).exists()
-            if check_contract_user:
-                raise serializers.ValidationError(
-                    'contract with name already exists')
-            return attrs
-        return super().validate(attrs)
-
 
 class ContractDetailSerializer(ContractSerializer):
     """Serializer for contract detail view."""
 
     class Meta(ContractSerializer.Meta):
         fields = ContractSerializer.Meta.fields + ['description']
+
+
+class ProvisioningJobSerializer(TimedSerializerMixin,
+                                serializers.ModelSerializer):
+    """Serializer for contract provisioning jobs."""
+
+    class Meta:
+        model = ProvisioningJob
+        list_serializer_class = TimedListSerializer
+        fields = ['id', 'contract', 'status', 'error',
+                  'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
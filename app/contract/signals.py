@@ -0,0 +1,121 @@
+"""
+Signal handlers invalidating cached contract trees and advancing versions.
+"""
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core.models import (
+    Contract,
+    Garden,
+    Plant,
+)
+
+from contract.cache import contract_cache
+from contract.versions import (
+    touch_contracts,
+    touch_gardens,
+    touch_gardens_on_commit,
+)
+
+# Plant fields shown in garden and contract trees.
+PLANT_TREE_FIELDS = {'name', 'garden', 'garden_id'}
+
+
+@receiver(post_save, sender=Contract)
+@receiver(post_save, sender=Garden)
+@receiver(post_save, sender=Plant)
+@receiver(post_delete, sender=Contract)
+@receiver(post_delete, sender=Garden)
+@receiver(post_delete, sender=Plant)
+def invalidate_owner(sender, instance, **kwargs):
+    """Invalidate the cached trees of the owner of instance."""
+    contract_cache.invalidate_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Contract.gardens.through)
+@receiver(m2m_changed, sender=Garden.plants.through)
+def invalidate_related_owners(sender, instance, action, model, pk_set,
+                              **kwargs):
+    """Invalidate the cached trees of both sides of an M2M change."""
+    if not action.startswith('post_'):
+        return
+    user_ids = {instance.user_id}
+    if pk_set:
+        user_ids.update(model.objects.filter(
+            pk__in=pk_set).values_list('user_id', flat=True))
+    for user_id in user_ids:
+        contract_cache.invalidate_user(user_id)
+
+
+def saves_tree_fields(update_fields):
+    """Return whether a save of update_fields may change a plant tree."""
+    return update_fields is None or bool(PLANT_TREE_FIELDS & set(
+        update_fields))
+
+
+@receiver(pre_save, sender=Plant)
+def remember_garden(sender, instance, update_fields=None, **kwargs):
+    """Read the stored garden of a plant loaded without it.
+
+    Plants read from the database remember their garden in from_db(), so
+    this only queries for plants loaded with their garden deferred.
+    """
+    if (saves_tree_fields(update_fields) and
+            not hasattr(instance, '_stored_garden_id') and
+            not instance._state.adding):
+        instance._stored_garden_id = Plant.objects.filter(
+            pk=instance.pk).values_list('garden_id', flat=True).first()
+
+
+@receiver(post_save, sender=Plant)
+def touch_plant_gardens(sender, instance, update_fields=None, **kwargs):
+    """Advance the old and new garden of plant unless only metrics changed."""
+    if not saves_tree_fields(update_fields):
+        return
+    touch_gardens({getattr(instance, '_stored_garden_id', None),
+                   instance.garden_id})
+    instance._stored_garden_id = instance.garden_id
+
+
+@receiver(post_delete, sender=Plant)
+def touch_deleted_plant_garden(sender, instance, **kwargs):
+    """Advance the garden of a deleted plant with those of its delete."""
+    touch_gardens_on_commit({instance.garden_id})
+
+
+@receiver(post_save, sender=Garden)
+def touch_saved_garden(sender, instance, created, **kwargs):
+    """Advance a changed garden and its contracts."""
+    if not created:
+        touch_gardens({instance.id})
+
+
+@receiver(pre_delete, sender=Garden)
+def touch_garden_contracts(sender, instance, **kwargs):
+    """Advance the contracts of a garden before its links are deleted."""
+    touch_contracts(instance.contract_set.values('id'))
+
+
+@receiver(post_save, sender=Contract)
+def touch_saved_contract(sender, instance, created, **kwargs):
+    """Advance a changed contract."""
+    if not created:
+        touch_contracts({instance.id})
+
+
+@receiver(m2m_changed, sender=Contract.gardens.through)
+def touch_linked_contracts(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Advance the contracts whose gardens changed."""
+    if reverse and action == 'pre_clear':
+        touch_contracts(instance.contract_set.values('id'))
+    elif not reverse and action.startswith('post_'):
+        touch_contracts({instance.id})
+    elif reverse and action in ('post_add', 'post_remove'):
+        touch_contracts(pk_set)
@@ -0,0 +1,52 @@
+"""
+Aggregated plant metrics for gardens and contracts.
+"""
+from django.db.models import (
+    Aggregate,
+    Avg,
+    Count,
+    FloatField,
+    Max,
+    Min,
+)
+
+from core.models import PLANT_MEASURED_FIELDS
+
+PERCENTILES = [50, 90, 99]
+
+
+class Percentile(Aggregate):
+    """Continuous percentile of expression (PostgreSQL)."""
+    function = 'PERCENTILE_CONT'
+    name = 'Percentile'
+    output_field = FloatField()
+    template = ('%(function)s(%(fraction)s) '
+                'WITHIN GROUP (ORDER BY %(expressions)s)')
+
+    def __init__(self, expression, percentile, **extra):
+        fraction = float(percentile) / 100
+        super().__init__(expression, fraction=fraction, **extra)
+
+
+def plant_stats(plants):
+    """Return count and mean/min/max/percentiles of metrics of plants.
+
+    Every statistic is computed by one aggregate query.
+    """
+    aggregates = {'count': Count('id')}
+    for field in PLANT_MEASURED_FIELDS:
+        aggregates[f'{field}__mean'] = Avg(field)
+        aggregates[f'{field}__min'] = Min(field)
+        aggregates[f'{field}__max'] = Max(field)
+        for percentile in PERCENTILES:
+            aggregates[f'{field}__p{percentile}'] = Percentile(
+                field, percentile)
+
+    row = plants.aggregate(**aggregates)
+    metrics = {}
+    for key, value in row.items():
+        if key == 'count':
+            continue
+        field, stat = key.split('__')
+        metrics.setdefault(field, {})[stat] = value
+    return {'plants': row['count'], 'metrics': metrics}
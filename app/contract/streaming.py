@@ -0,0 +1,65 @@
+"""
+Streaming JSON responses for large listings.
+"""
+from itertools import islice
+
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+
+from contract.rows import row_serializer
+from core.renderers import FastJSONRenderer
+
+
+def stream_result(queryset, serializer_class, chunk_size, prefetch=(),
+                  context=None):
+    """Yield the `{"result": [...]}` envelope of queryset as JSON bytes.
+
+    Rows are read from a server side cursor and serialized one chunk at a
+    time, prefetching the relations of each chunk, so memory stays flat
+    however many rows there are.
+    """
+    renderer = FastJSONRenderer()
+    fast = row_serializer(serializer_class(context=context))
+    if fast is not None:
+        queryset = fast.values(queryset)
+    rows = queryset.prefetch_related(None).iterator(chunk_size=chunk_size)
+    separator = b''
+    yield b'{"result":['
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        if fast is not None:
+            data = fast.serialize(chunk)
+        else:
+            if prefetch:
+                prefetch_related_objects(chunk, *prefetch)
+            data = serializer_class(chunk, many=True, context=context).data
+        for item in data:
+            yield separator + renderer.render(item)
+            separator = b','
+    yield b']}'
+
+
+class StreamingListMixin:
+    """List action streaming the whole result when `?stream=true` is set."""
+    stream_chunk_size = 500
+
+    def get_stream_prefetch_plan(self):
+        """Return the prefetches applied to every streamed chunk."""
+        return []
+
+    def should_stream(self):
+        """Return whether the client asked for a streamed listing."""
+        stream = self.request.query_params.get('stream', '')
+        return stream.lower() in ('1', 'true')
+
+    def stream_list(self, queryset, serializer_class):
+        """Return streaming response listing queryset."""
+        return StreamingHttpResponse(
+            stream_result(queryset, serializer_class,
+                          self.stream_chunk_size,
+                          self.get_stream_prefetch_plan(),
+                          self.get_serializer_context()),
+            content_type='application/json',
+        )
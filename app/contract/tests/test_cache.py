@@ -0,0 +1,170 @@
+"""
+Tests for the contract read cache.
+"""
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Contract,
+    Garden,
+    Plant,
+)
+
+from contract.cache import (
+    ContractCache,
+    contract_cache,
+)
+from contract.provisioning import provision_contract
+
+CONTRACTS_URL = reverse('contract:contract-list')
+
+
+def detail_url(contract_id):
+    """Create and return contract detail URL."""
+    return reverse('contract:contract-detail', args=[contract_id])
+
+
+def create_user(email='user@example.com', password='testpass123'):
+    """Create and return user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class ContractCacheApiTests(TestCase):
+    """Test caching of contract payloads."""
+
+    def setUp(self):
+        contract_cache.reset()
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.contract = Contract.objects.create(user=self.user,
+                                                name='contract', level=1)
+        provision_contract(self.contract)
+
+    def test_detail_served_from_cache(self):
+        """Test a repeated detail request only reads the versions."""
+        url = detail_url(self.contract.id)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(url)
+
+        self.assertEqual(cached['X-Cache'], 'HIT')
+        self.assertEqual(cached.data, response.data)
+        self.assertEqual(contract_cache.stats()['hits'], 1)
+        self.assertEqual(contract_cache.stats()['misses'], 1)
+
+    def test_list_served_from_cache(self):
+        """Test a repeated list request is a cache hit."""
+        self.client.get(CONTRACTS_URL)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(CONTRACTS_URL)
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(response.data['result']), 1)
+
+    def test_stale_entry_not_served(self):
+        """Test an entry older than the stored versions is not served."""
+        url = detail_url(self.contract.id)
+        response = self.client.get(url)
+        Contract.objects.filter(pk=self.contract.pk).update(
+            version=F('version') + 1)
+
+        revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
+        self.assertEqual(revalidated['X-Cache'], 'MISS')
+
+    def test_garden_update_invalidates(self):
+        """Test updating a garden invalidates the cached tree."""
+        url = detail_url(self.contract.id)
+        self.client.get(url)
+        garden = self.contract.gardens.first()
+        garden.name = 'renamed'
+        garden.save()
+
+        response = self.client.get(url)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('renamed', [garden['name']
+                                  for garden in response.data['gardens']])
+
+    def test_plant_delete_invalidates(self):
+        """Test deleting a plant invalidates the cached tree."""
+        url = detail_url(self.contract.id)
+        self.client.get(url)
+
+        Plant.objects.filter(user=self.user).first().delete()
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_m2m_change_invalidates(self):
+        """Test adding a garden to the contract invalidates the tree."""
+        url = detail_url(self.contract.id)
+        garden = Garden.objects.create(user=self.user, name='extra')
+        self.client.get(url)
+
+        self.contract.gardens.add(garden)
+
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['gardens']), 11)
+
+    def test_cache_scoped_to_user(self):
+        """Test cached payloads are not shared between users."""
+        self.client.get(CONTRACTS_URL)
+        other_user = create_user(email='other@example.com')
+        self.client.force_authenticate(other_user)
+
+        response = self.client.get(CONTRACTS_URL)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['result'], [])
+
+    @override_settings(CONTRACT_CACHE={
+        'BACKEND': 'core.cache.LRUCacheBackend',
+        'TIMEOUT': 60,
+        'MAX_ENTRIES': 16,
+    })
+    def test_lru_cache_backend(self):
+        """Test payloads can be kept in process."""
+        url = detail_url(self.contract.id)
+        self.client.get(url)
+
+        response = self.client.get(url)
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_unknown_backend_option_rejected(self):
+        """Test options the backend does not take are not ignored."""
+        cache = ContractCache()
+
+        with override_settings(CONTRACT_CACHE={
+            'BACKEND': 'contract.cache.DjangoCacheBackend',
+            'TIMEOUT': 60,
+            'MAX_ENTRIES': 16,
+        }):
+            with self.assertRaises(ImproperlyConfigured):
+                cache.backend
+
+    def test_invalidation_shared_between_processes(self):
+        """Test an invalidation in one process reaches the others."""
+        writer, reader = ContractCache(), ContractCache()
+        key = reader.make_key(self.user.id, 'detail')
+        reader.set(key, {'name': 'old'})
+
+        writer.invalidate_user(self.user.id)
+
+        self.assertNotEqual(reader.make_key(self.user.id, 'detail'), key)
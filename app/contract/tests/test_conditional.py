@@ -0,0 +1,255 @@
+"""
+Tests for versions and conditional GET of contract resources.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Contract,
+    Garden,
+    Plant,
+)
+
+from contract.cache import contract_cache
+from contract.provisioning import provision_contract
+
+CONTRACTS_URL = reverse('contract:contract-list')
+GARDENS_URL = reverse('contract:garden-list')
+
+
+def detail_url(contract_id):
+    """Create and return contract detail URL."""
+    return reverse('contract:contract-detail', args=[contract_id])
+
+
+class VersionTests(TestCase):
+    """Test changes advance the versions of gardens and contracts."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123')
+        self.contract = Contract.objects.create(user=self.user,
+                                                name='contract', level=1)
+        provision_contract(self.contract)
+        self.garden = self.contract.gardens.order_by('id').first()
+        self.plant = self.garden.plant_set.first()
+
+    def assertAdvanced(self, change, *instances):
+        versions = [type(instance).objects.get(pk=instance.pk).version
+                    for instance in instances]
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        for instance, version in zip(instances, versions):
+            self.assertGreater(
+                type(instance).objects.get(pk=instance.pk).version, version)
+
+    def test_plant_change(self):
+        """Test renaming a plant advances its garden and contract."""
+        def rename():
+            self.plant.name = 'renamed'
+            self.plant.save()
+
+        self.assertAdvanced(rename, self.garden, self.contract)
+
+    def test_plant_moved(self):
+        """Test moving a plant advances the old and the new garden."""
+        other = self.contract.gardens.order_by('id').last()
+
+        def move():
+            self.plant.garden = other
+            self.plant.save()
+
+        self.assertAdvanced(move, self.garden, other, self.contract)
+
+    def test_plant_delete(self):
+        """Test deleting a plant advances its garden and contract."""
+        self.assertAdvanced(self.plant.delete, self.garden, self.contract)
+
+    def test_plant_save_reads_no_garden(self):
+        """Test saving a loaded plant does not read its stored garden."""
+        plant = Plant.objects.get(pk=self.plant.pk)
+        plant.name = 'renamed'
+
+        with CaptureQueriesContext(connection) as context:
+            plant.save()
+
+        self.assertFalse([query for query in context.captured_queries
+                          if query['sql'].startswith('SELECT')])
+
+    def test_plants_deleted_together(self):
+        """Test deleting many plants advances each garden once."""
+        version = Garden.objects.get(pk=self.garden.pk).version
+        with CaptureQueriesContext(connection) as context:
+            with self.captureOnCommitCallbacks(execute=True):
+                Plant.objects.filter(user=self.user).delete()
+
+        updates = [query for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(Garden.objects.get(pk=self.garden.pk).version,
+                         version + 1)
+
+    def test_garden_delete(self):
+        """Test deleting a garden advances its contracts."""
+        self.assertAdvanced(self.garden.delete, self.contract)
+
+    def test_gardens_changed(self):
+        """Test adding gardens advances the contract from either side."""
+        garden = Garden.objects.create(user=self.user, name='extra')
+
+        self.assertAdvanced(lambda: self.contract.gardens.add(garden),
+                            self.contract)
+        self.assertAdvanced(lambda: garden.contract_set.clear(),
+                            self.contract)
+
+    def test_metrics_keep_versions(self):
+        """Test saving only metrics leaves the versions alone."""
+        garden_version = Garden.objects.get(pk=self.garden.pk).version
+        self.plant.health = 5
+        self.plant.save(update_fields=['health', 'updated_at'])
+
+        self.assertEqual(Garden.objects.get(pk=self.garden.pk).version,
+                         garden_version)
+
+
+class ConditionalGetTests(TestCase):
+    """Test unchanged contract resources are answered with 304."""
+
+    def setUp(self):
+        contract_cache.reset()
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.contract = Contract.objects.create(user=self.user,
+                                                name='contract', level=1)
+        provision_contract(self.contract)
+
+    def revalidate(self, url, response, params=None):
+        """Request url again with the ETag of response and no cache."""
+        contract_cache.invalidate_user(self.user.id)
+        headers = {'HTTP_IF_NONE_MATCH': response['ETag']}
+        return self.client.get(url, params, **headers)
+
+    def test_contract_detail_not_modified(self):
+        """Test an unchanged detail is answered from one query."""
+        url = detail_url(self.contract.id)
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+
+        with self.assertNumQueries(1):
+            revalidated = self.revalidate(url, response)
+
+        self.assertEqual(revalidated.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(revalidated.content, b'')
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_cached_detail_not_modified(self):
+        """Test a cached detail is revalidated with the version query."""
+        url = detail_url(self.contract.id)
+        response = self.client.get(url)
+
+        with self.assertNumQueries(1):
+            revalidated = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(revalidated.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+    def test_if_modified_since(self):
+        """Test details unchanged since Last-Modified are not sent."""
+        url = detail_url(self.contract.id)
+        response = self.client.get(url)
+
+        revalidated = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        self.assertEqual(revalidated.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+    def test_plant_change_modifies_contract(self):
+        """Test renaming a nested plant changes the contract ETag."""
+        url = detail_url(self.contract.id)
+        response = self.client.get(url)
+        plant = Plant.objects.filter(user=self.user).first()
+        plant.name = 'renamed'
+        plant.save()
+
+        revalidated = self.revalidate(url, response)
+
+        self.assertEqual(revalidated.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(revalidated['ETag'], response['ETag'])
+
+    def test_metrics_keep_contract(self):
+        """Test bulk metric updates leave the contract unmodified."""
+        url = detail_url(self.contract.id)
+        response = self.client.get(url)
+        plant = Plant.objects.filter(user=self.user).first()
+        updated = self.client.patch(
+            reverse('contract:plant-bulk-update'),
+            {'plants': [{'id': plant.id, 'health': 3}]}, format='json')
+        self.assertEqual(updated.status_code, status.HTTP_200_OK)
+
+        revalidated = self.revalidate(url, response)
+
+        self.assertEqual(revalidated.status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+
+    def test_contract_list(self):
+        """Test the list is not modified until a contract is deleted."""
+        response = self.client.get(CONTRACTS_URL)
+        self.assertNotIn('Last-Modified', response)
+
+        self.assertEqual(self.revalidate(CONTRACTS_URL, response).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.contract.delete()
+        self.assertEqual(self.revalidate(CONTRACTS_URL, response).status_code,
+                         status.HTTP_200_OK)
+
+    def test_representations(self):
+        """Test other projections and id formats have other ETags."""
+        url = detail_url(self.contract.id)
+        response = self.client.get(url)
+
+        projected = self.revalidate(url, response, {'fields': 'name'})
+        with override_settings(PLANT_GARDEN_ID_COMPAT=False):
+            compat = self.revalidate(url, response)
+
+        self.assertEqual(projected.status_code, status.HTTP_200_OK)
+        self.assertEqual(compat.status_code, status.HTTP_200_OK)
+
+    def test_gardens(self):
+        """Test garden list and detail are not modified until renamed."""
+        garden = Garden.objects.filter(user=self.user).first()
+        url = reverse('contract:garden-detail', args=[garden.id])
+        detail = self.client.get(url)
+        listing = self.client.get(GARDENS_URL)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.revalidate(url, detail).status_code,
+                             status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.revalidate(GARDENS_URL, listing).status_code,
+                         status.HTTP_304_NOT_MODIFIED)
+        self.client.patch(url, {'name': 'renamed'})
+        self.assertEqual(self.revalidate(url, detail).status_code,
+                         status.HTTP_200_OK)
+        self.assertEqual(self.revalidate(GARDENS_URL, listing).status_code,
+                         status.HTTP_200_OK)
+
+    def test_missing_contract(self):
+        """Test missing and malformed contracts are still not found."""
+        for pk in ('00000000-0000-0000-0000-000000000000', 'malformed'):
+            response = self.client.get(detail_url(pk),
+                                       HTTP_IF_NONE_MATCH='*')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,16 +1,28 @@
 """
 Test for contract APIs.
 """
+import json
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.db import (
+    IntegrityError,
+    connection,
+)
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
-from core.models import Contract
+from core.models import (
+    Contract,
+    Garden,
+)
 
+from contract.provisioning import provision_contract
 from contract.serializers import (
     ContractSerializer,
     ContractDetailSerializer,
@@ -67,7 +79,7 @@ class PrivateContractAPITests(TestCase):
     def test_retrieve_contracts(self):
         """Test retrieving list of contracts"""
         create_contract(user=self.user)
-        create_contract(user=self.user)
+        create_contract(user=self.user, name='other contract')
 
         response = self.client.get(CONTRACTS_URL)
 
@@ -92,6 +104,56 @@ class PrivateContractAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['result'], serializer.data)
 
+    def test_contracts_paginated_by_cursor(self):
+        """Test paging through contracts by cursor in primary key order."""
+        for i in range(5):
+            create_contract(user=self.user, name=f'contract {i}')
+
+        response = self.client.get(CONTRACTS_URL, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['previous'])
+        ids = [contract['id'] for contract in response.data['result']]
+        while response.data['next']:
+            # versions, contracts, gardens
+            with self.assertNumQueries(3):
+                response = self.client.get(response.data['next'])
+            ids += [contract['id'] for contract in response.data['result']]
+
+        expected = Contract.objects.order_by('-id')
+        self.assertEqual(ids, [str(contract.id) for contract in expected])
+
+    def test_stream_contracts(self):
+        """Test streaming contracts keeps the result envelope."""
+        for level in (1, 2):
+            contract = create_contract(user=self.user,
+                                       name=f'contract {level}', level=level)
+            provision_contract(contract)
+
+        response = self.client.get(CONTRACTS_URL, {'stream': 'true'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        content = json.loads(b''.join(response.streaming_content))
+        contracts = Contract.objects.filter(
+            user=self.user).order_by('-id')
+        serializer = ContractSerializer(contracts, many=True)
+        self.assertEqual(content, {'result': json.loads(
+            JSONRenderer().render(serializer.data))})
+
+    @patch('contract.views.ContractViewSet.stream_chunk_size', 2)
+    def test_stream_contracts_query_count(self):
+        """Test streaming prefetches relations once per chunk."""
+        for i in range(3):
+            contract = create_contract(user=self.user, name=f'contract {i}')
+            provision_contract(contract)
+
+        response = self.client.get(CONTRACTS_URL, {'stream': 'true'})
+
+        # contracts, then gardens and plants for each of the two chunks
+        with self.assertNumQueries(5):
+            content = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(content['result']), 3)
+
     def test_get_contract_detail(self):
         """Test get contract detail."""
         contract = create_contract(user=self.user)
@@ -104,6 +166,116 @@ class PrivateContractAPITests(TestCase):
         self.assertEqual(response.data, serializer.data)
         self.assertIn('description', serializer.data)
 
+    def test_list_contracts_query_count(self):
+        """Test listing contracts runs a fixed number of queries."""
+        for level in (1, 3):
+            contract = create_contract(user=self.user,
+                                       name=f'contract {level}', level=level)
+            provision_contract(contract)
+
+        # versions, contracts, gardens, plants
+        with self.assertNumQueries(4):
+            response = self.client.get(CONTRACTS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        gardens = [garden for contract in response.data['result']
+                   for garden in contract['gardens']]
+        self.assertEqual(len(gardens), 40)
+
+    def test_get_contract_detail_query_count(self):
+        """Test retrieving contract detail runs a fixed number of queries."""
+        contract = create_contract(user=self.user, level=3)
+        provision_contract(contract)
+
+        # versions, contract, gardens, plants
+        with self.assertNumQueries(4):
+            response = self.client.get(detail_url(contract.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['gardens']), 30)
+        self.assertEqual(len(response.data['gardens'][0]['plants']), 30)
+
+    def test_list_contract_names_only(self):
+        """Test selecting flat fields skips the nested levels."""
+        contract = create_contract(user=self.user, level=3)
+        provision_contract(contract)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(CONTRACTS_URL, {'fields': 'id,name'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['result'],
+                         [{'id': str(contract.id), 'name': contract.name}])
+        # versions, contracts
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('description', queries[1]['sql'])
+
+    def test_contract_detail_nested_fields(self):
+        """Test dotted fields select the fields of nested levels."""
+        contract = create_contract(user=self.user, level=1)
+        provision_contract(contract)
+
+        with self.assertNumQueries(4):
+            response = self.client.get(detail_url(contract.id), {
+                'fields': 'name,gardens.name,gardens.plants.id'})
+
+        self.assertEqual(set(response.data), {'name', 'gardens'})
+        garden = response.data['gardens'][0]
+        self.assertEqual(set(garden), {'name', 'plants'})
+        self.assertEqual(set(garden['plants'][0]), {'id'})
+
+    def test_contract_detail_expand(self):
+        """Test expand keeps only the listed nested levels."""
+        contract = create_contract(user=self.user, level=1)
+        provision_contract(contract)
+
+        with self.assertNumQueries(2):
+            collapsed = self.client.get(detail_url(contract.id),
+                                        {'expand': ''})
+        with self.assertNumQueries(3):
+            gardens = self.client.get(detail_url(contract.id),
+                                      {'expand': 'gardens'})
+
+        self.assertNotIn('gardens', collapsed.data)
+        self.assertEqual(collapsed.data['description'],
+                         contract.description)
+        self.assertNotIn('plants', gardens.data['gardens'][0])
+
+    def test_contract_detail_cached_per_projection(self):
+        """Test cached details of other projections are not served."""
+        contract = create_contract(user=self.user)
+        self.client.get(detail_url(contract.id))
+
+        response = self.client.get(detail_url(contract.id),
+                                   {'fields': 'name'})
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data, {'name': contract.name})
+
+    def test_stream_contracts_projection(self):
+        """Test streamed contracts are projected too."""
+        create_contract(user=self.user)
+
+        response = self.client.get(CONTRACTS_URL,
+                                   {'stream': 'true', 'fields': 'name'})
+
+        content = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(content['result'], [{'name': 'contract name'}])
+
+    def test_unknown_projection_field_rejected(self):
+        """Test unknown fields and levels return a bad request."""
+        contract = create_contract(user=self.user)
+
+        for params in ({'fields': 'name,secret'},
+                       {'fields': 'gardens.secret'},
+                       {'expand': 'name'},
+                       {'fields': 'gardens..name'}):
+            response = self.client.get(detail_url(contract.id), params)
+
+            self.assertEqual(response.status_code,
+                             status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), response.data)
+
     def test_create_contract_with_new_gardens_and_new_plants(self):
         """Test creating contract with new gardens."""
         payload = {
@@ -141,6 +313,38 @@ class PrivateContractAPITests(TestCase):
         self.assertEqual(response.data['errors'][0][:],
                          'contract with name already exists')
 
+    def test_create_contract_name_unique_ignoring_case(self):
+        """Test contract names differing only in case are duplicates."""
+        create_contract(user=self.user, name='Contract Name')
+        payload = {'name': 'contract name', 'level': 1}
+
+        response = self.client.post(CONTRACTS_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0],
+                         'contract with name already exists')
+        self.assertEqual(Contract.objects.filter(user=self.user).count(), 1)
+        self.assertFalse(Garden.objects.filter(user=self.user).exists())
+
+    def test_other_integrity_error_not_duplicate_name(self):
+        """Test only violations of the name index are duplicate names."""
+        error = IntegrityError('contract_user_lower_name_uniq in message')
+        payload = {'name': 'contract name', 'level': 1}
+
+        with patch('core.models.Contract.objects.create', side_effect=error):
+            with self.assertRaises(IntegrityError):
+                self.client.post(CONTRACTS_URL, payload, format='json')
+
+    def test_create_contract_with_other_user_contract_name(self):
+        """Test contract names are only unique per user."""
+        create_contract(user=create_user(email='user2@example.com',
+                                         password='pas123'))
+        payload = {'name': 'contract name', 'level': 1}
+
+        response = self.client.post(CONTRACTS_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
     def test_partial_update_not_allowed(self):
         """Test partial update of a contract."""
         contract = create_contract(
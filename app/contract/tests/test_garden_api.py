@@ -8,7 +8,10 @@ from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Garden
+from core.models import (
+    Garden,
+    Plant,
+)
 
 from contract.serializers import GardenSerializer
 
@@ -60,7 +63,75 @@ class PrivateGardensApiTests(TestCase):
         serializer = GardenSerializer(gardens, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data['result'], serializer.data)
+
+    def test_retrieve_gardens_query_count(self):
+        """Test listing gardens runs a fixed number of queries."""
+        for level in (1, 2, 3):
+            garden = Garden.objects.create(user=self.user,
+                                           name=f'garden {level}',
+                                           level=level)
+            for i in range(level * 10):
+                plant = Plant.objects.create(user=self.user,
+                                             garden_id=garden.id,
+                                             name=f'plant {i}')
+                garden.plants.add(plant)
+
+        # versions, gardens, plants
+        with self.assertNumQueries(3):
+            response = self.client.get(GARDENS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sum(len(garden['plants'])
+                             for garden in response.data['result']), 60)
+
+    def test_garden_fields(self):
+        """Test gardens are listed and searched with selected fields."""
+        garden = Garden.objects.create(user=self.user, name='garden')
+        Plant.objects.create(user=self.user, garden=garden, name='plant')
+
+        # versions, gardens
+        with self.assertNumQueries(2):
+            response = self.client.get(GARDENS_URL, {'fields': 'id'})
+        search = self.client.get(GARDENS_URL,
+                                 {'fields': 'id,level', 'name': 'gar'})
+
+        self.assertEqual(response.data['result'], [{'id': garden.id}])
+        self.assertEqual(search.data['result'],
+                         [{'id': garden.id, 'level': garden.level}])
+
+    def test_garden_search_with_plants(self):
+        """Test plants requested by the projection are kept in searches."""
+        garden = Garden.objects.create(user=self.user, name='garden')
+        plant = Plant.objects.create(user=self.user, garden=garden,
+                                     name='plant')
+        Garden.objects.create(user=self.user, name='other')
+
+        response = self.client.get(GARDENS_URL,
+                                   {'fields': 'id,plants.id', 'name': 'gar'})
+        expanded = self.client.get(GARDENS_URL,
+                                   {'expand': 'plants', 'name': 'gar'})
+
+        self.assertEqual(response.data['result'],
+                         [{'id': garden.id, 'plants': [{'id': plant.id}]}])
+        self.assertEqual(len(expanded.data['result']), 1)
+        self.assertEqual(expanded.data['result'][0]['plants'][0]['id'],
+                         plant.id)
+
+    def test_gardens_paginated_by_cursor(self):
+        """Test gardens with equal names are paged without repeats."""
+        for i in range(5):
+            Garden.objects.create(user=self.user, name='same name')
+
+        response = self.client.get(GARDENS_URL, {'page_size': 2})
+        ids = [garden['id'] for garden in response.data['result']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            self.assertLessEqual(len(response.data['result']), 2)
+            ids += [garden['id'] for garden in response.data['result']]
+
+        expected = Garden.objects.order_by('-name', '-id')
+        self.assertEqual(ids, [garden.id for garden in expected])
 
     def test_update_garden(self):
         """Test updating garden."""
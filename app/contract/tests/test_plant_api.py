@@ -0,0 +1,302 @@
+"""
+Tests for the plant APIs.
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import (
+    TestCase,
+    override_settings,
+)
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Contract,
+    Garden,
+    Plant,
+)
+
+
+PLANTS_URL = reverse('contract:plant-list')
+BULK_UPDATE_URL = reverse('contract:plant-bulk-update')
+
+
+def detail_url(plant_id):
+    """Create and return plant detail url."""
+    return reverse('contract:plant-detail', args=[plant_id])
+
+
+def create_user(email='user@example.com', password='testpass123'):
+    """Create and return user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_plant(user, **params):
+    """Create and return plant."""
+    defaults = {
+        'name': 'plant',
+    }
+    defaults.update(params)
+
+    return Plant.objects.create(user=user, **defaults)
+
+
+class PublicPlantsApiTests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required for retrieving plants."""
+        response = self.client.get(PLANTS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivatePlantsApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_plants_paginated(self):
+        """Test plants are returned one page at a time."""
+        for i in range(5):
+            create_plant(user=self.user, name=f'plant {i}')
+
+        response = self.client.get(PLANTS_URL, {'page_size': 3})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['result']), 3)
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(response.data['next'])
+
+        self.assertEqual(len(response.data['result']), 2)
+        self.assertIsNone(response.data['next'])
+
+    def test_plants_limited_to_user(self):
+        """Test only the plants of the authenticated user are listed."""
+        other_user = create_user(email='other@example.com')
+        create_plant(user=other_user, name='other plant')
+        create_plant(user=self.user, name='own plant')
+
+        response = self.client.get(PLANTS_URL)
+        streamed = self.client.get(PLANTS_URL, {'stream': 'true'})
+
+        self.assertEqual(
+            [plant['name'] for plant in response.data['result']],
+            ['own plant'])
+        content = json.loads(b''.join(streamed.streaming_content))
+        self.assertEqual(
+            [plant['name'] for plant in content['result']], ['own plant'])
+
+    def test_other_user_plant_not_changed(self):
+        """Test plants of other users cannot be updated or deleted."""
+        other_user = create_user(email='other@example.com')
+        plant = create_plant(user=other_user, health=1)
+
+        response = self.client.patch(detail_url(plant.id), {'health': 5})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.delete(detail_url(plant.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        plant.refresh_from_db()
+        self.assertEqual(plant.health, 1)
+
+    def test_filter_plants(self):
+        """Test filtering plants by garden, contract, emptiness and range."""
+        garden = Garden.objects.create(user=self.user, name='garden')
+        contract = Contract.objects.create(user=self.user, name='contract')
+        contract.gardens.add(garden)
+        create_plant(user=self.user, name='in garden', garden=garden,
+                     health=2)
+        create_plant(user=self.user, name='empty', has_plant=False,
+                     health=8)
+        create_plant(user=self.user, name='sick', disease=6, health=5)
+
+        def names(params):
+            response = self.client.get(PLANTS_URL, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return {plant['name'] for plant in response.data['result']}
+
+        self.assertEqual(names({'garden': garden.id}), {'in garden'})
+        self.assertEqual(names({'contract': contract.id}), {'in garden'})
+        self.assertEqual(names({'has_plant': 'false'}), {'empty'})
+        self.assertEqual(names({'health__lt': 5}), {'in garden'})
+        self.assertEqual(names({'health__gte': 5, 'disease__gt': 0}),
+                         {'sick'})
+
+    def test_filter_invalid_value_rejected(self):
+        """Test an invalid filter value returns a bad request."""
+        for params in ({'garden': 'first'}, {'contract': '1'},
+                       {'has_plant': 'maybe'}, {'health__lt': 'nan'}):
+            response = self.client.get(PLANTS_URL, params)
+
+            self.assertEqual(response.status_code,
+                             status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), response.data)
+
+    def test_plant_fields(self):
+        """Test plants are listed with the selected fields only."""
+        plant = create_plant(user=self.user)
+
+        response = self.client.get(PLANTS_URL, {'fields': 'id'})
+
+        self.assertEqual(response.data['result'], [{'id': plant.id}])
+
+    def test_deep_page_query_count(self):
+        """Test a later page costs the same queries as the first one."""
+        for i in range(10):
+            create_plant(user=self.user, name=f'plant {i}')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(PLANTS_URL, {'page_size': 2})
+        for i in range(3):
+            with self.assertNumQueries(1):
+                response = self.client.get(response.data['next'])
+
+        self.assertEqual(len(response.data['result']), 2)
+
+    def test_stream_plants(self):
+        """Test streaming lists every plant in one envelope."""
+        for i in range(5):
+            create_plant(user=self.user, name=f'plant {i}')
+
+        response = self.client.get(PLANTS_URL, {'stream': 'true'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(
+            [plant['name'] for plant in content['result']],
+            [f'plant {i}' for i in reversed(range(5))],
+        )
+
+    def test_bulk_update_plant_metrics(self):
+        """Test updating metrics of many plants in one request."""
+        plants = [create_plant(user=self.user, name=f'plant {i}')
+                  for i in range(20)]
+        payload = {'plants': [
+            {'id': plant.id, 'health': i, 'disease': 0.5}
+            for i, plant in enumerate(plants)
+        ]}
+        payload['plants'][0]['has_plant'] = False
+
+        # savepoint, select plants, update plants, release savepoint
+        with self.assertNumQueries(4):
+            response = self.client.patch(BULK_UPDATE_URL, payload,
+                                         format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 20)
+        for i, plant in enumerate(plants):
+            plant.refresh_from_db()
+            self.assertEqual(plant.health, i)
+            self.assertEqual(plant.disease, 0.5)
+            self.assertEqual(plant.has_plant, i != 0)
+            self.assertEqual(plant.height, 0)
+
+    def test_bulk_update_other_user_plant_rejected(self):
+        """Test bulk update fails without changes for foreign plants."""
+        other_user = create_user(email='other@example.com')
+        plant = create_plant(user=self.user)
+        other_plant = create_plant(user=other_user)
+        payload = {'plants': [
+            {'id': plant.id, 'health': 1},
+            {'id': other_plant.id, 'health': 1},
+        ]}
+
+        response = self.client.patch(BULK_UPDATE_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        plant.refresh_from_db()
+        other_plant.refresh_from_db()
+        self.assertEqual(plant.health, 0)
+        self.assertEqual(other_plant.health, 0)
+
+    def test_bulk_update_invalid_value_rejected(self):
+        """Test bulk update validates every record."""
+        plant = create_plant(user=self.user)
+        payload = {'plants': [{'id': plant.id, 'health': 'high'}]}
+
+        response = self.client.patch(BULK_UPDATE_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_non_finite_value_rejected(self):
+        """Test bulk update rejects NaN and infinite metrics."""
+        plant = create_plant(user=self.user)
+
+        for value in ('NaN', 'Infinity', '-inf'):
+            payload = {'plants': [{'id': plant.id, 'health': value}]}
+            response = self.client.patch(BULK_UPDATE_URL, payload,
+                                         format='json')
+
+            self.assertEqual(response.status_code,
+                             status.HTTP_400_BAD_REQUEST)
+        plant.refresh_from_db()
+        self.assertEqual(plant.health, 0)
+
+    def test_bulk_update_duplicate_ids_rejected(self):
+        """Test a plant can only be listed once per bulk update."""
+        plant = create_plant(user=self.user)
+        payload = {'plants': [{'id': plant.id, 'health': 1},
+                              {'id': plant.id, 'health': 2}]}
+
+        response = self.client.patch(BULK_UPDATE_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PLANT_GARDEN_ID_COMPAT=True)
+    def test_garden_id_legacy_format(self):
+        """Test garden id is rendered as string in compatibility mode."""
+        garden = Garden.objects.create(user=self.user, name='garden')
+        create_plant(user=self.user, garden=garden)
+
+        response = self.client.get(PLANTS_URL)
+
+        self.assertEqual(response.data['result'][0]['garden_id'],
+                         str(garden.id))
+
+    @override_settings(PLANT_GARDEN_ID_COMPAT=False)
+    def test_garden_id_from_foreign_key(self):
+        """Test garden id is rendered as integer after the rollout."""
+        garden = Garden.objects.create(user=self.user, name='garden')
+        create_plant(user=self.user, garden=garden)
+
+        response = self.client.get(PLANTS_URL)
+
+        self.assertEqual(response.data['result'][0]['garden_id'], garden.id)
+
+    def test_update_plant_garden(self):
+        """Test moving a plant to another garden of the user."""
+        garden = Garden.objects.create(user=self.user, name='garden')
+        plant = create_plant(user=self.user)
+
+        response = self.client.patch(detail_url(plant.id),
+                                     {'garden_id': garden.id})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        plant.refresh_from_db()
+        self.assertEqual(plant.garden, garden)
+
+    def test_update_plant_other_user_garden_rejected(self):
+        """Test a plant cannot be moved to another user's garden."""
+        other_user = create_user(email='other@example.com')
+        garden = Garden.objects.create(user=other_user, name='garden')
+        plant = create_plant(user=self.user)
+
+        response = self.client.patch(detail_url(plant.id),
+                                     {'garden_id': garden.id})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        plant.refresh_from_db()
+        self.assertIsNone(plant.garden)
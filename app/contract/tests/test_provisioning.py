@@ -0,0 +1,68 @@
+"""
+Tests for contract provisioning.
+"""
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase
+
+from core.models import (
+    Contract,
+    Garden,
+    Plant,
+)
+
+from contract.provisioning import provision_contract
+
+
+def create_user(email='user@example.com', password='testpass123'):
+    """Create and return user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+class ProvisioningTests(TestCase):
+    """Test provisioning the garden/plant tree of a contract."""
+
+    def setUp(self):
+        self.user = create_user()
+
+    def test_provision_contract_creates_tree(self):
+        """Test provisioning creates gardens and plants for the level."""
+        contract = Contract.objects.create(user=self.user,
+                                           name='contract', level=2)
+
+        provision_contract(contract)
+
+        gardens = contract.gardens.all()
+        self.assertEqual(gardens.count(), 20)
+        self.assertEqual(Plant.objects.filter(user=self.user).count(), 400)
+        for garden in gardens:
+            self.assertEqual(garden.user, self.user)
+            self.assertEqual(garden.name, contract.name)
+            self.assertEqual(garden.level, contract.level)
+            plants = garden.plants.all()
+            self.assertEqual(plants.count(), 20)
+            for plant in plants:
+                self.assertEqual(int(plant.garden_id), garden.id)
+
+    def test_provision_contract_query_count_per_level(self):
+        """Test provisioning runs a constant number of queries per level."""
+        # savepoint, gardens, plants, garden plants, contract gardens,
+        # contract version, release savepoint
+        for level in (1, 2, 3):
+            contract = Contract.objects.create(user=self.user,
+                                               name=f'contract {level}',
+                                               level=level)
+            with self.subTest(level=level), self.assertNumQueries(7):
+                provision_contract(contract)
+
+    def test_provision_contract_rolls_back_on_error(self):
+        """Test a failed provisioning leaves no partial tree behind."""
+        contract = Contract.objects.create(user=self.user,
+                                           name='contract', level=1)
+        contract.id = None
+
+        with self.assertRaises(IntegrityError):
+            provision_contract(contract)
+
+        self.assertFalse(Garden.objects.exists())
+        self.assertFalse(Plant.objects.exists())
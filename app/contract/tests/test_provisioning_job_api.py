@@ -0,0 +1,216 @@
+"""
+Tests for asynchronous contract provisioning.
+"""
+import time
+from datetime import timedelta
+from unittest.mock import (
+    Mock,
+    patch,
+)
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Contract,
+    ProvisioningJob,
+)
+
+from contract.jobs import (
+    resume_pending_jobs,
+    run_provisioning_job,
+)
+
+CONTRACTS_URL = reverse('contract:contract-list')
+JOBS_URL = reverse('contract:provisioningjob-list')
+
+
+def job_url(job_id):
+    """Create and return provisioning job detail URL."""
+    return reverse('contract:provisioningjob-detail', args=[job_id])
+
+
+def create_user(email='user@example.com', password='testpass123'):
+    """Create and return user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+@override_settings(CONTRACT_PROVISIONING_ASYNC=True)
+class ProvisioningJobApiTests(TestCase):
+    """Test creating contracts in async provisioning mode."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_create_contract_returns_job(self):
+        """Test creating contract returns 202 with a pending job."""
+        payload = {'name': 'new contract', 'level': 1}
+
+        response = self.client.post(CONTRACTS_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = ProvisioningJob.objects.get(id=response.data['id'])
+        self.assertEqual(response['Location'], job_url(job.id))
+        self.assertEqual(job.status, ProvisioningJob.Status.PENDING)
+        self.assertEqual(job.user, self.user)
+        self.assertEqual(job.contract.name, payload['name'])
+        self.assertFalse(job.contract.gardens.exists())
+
+    def test_run_provisioning_job(self):
+        """Test running job provisions the contract and marks it done."""
+        contract = Contract.objects.create(user=self.user,
+                                           name='contract', level=1)
+        job = ProvisioningJob.objects.create(user=self.user,
+                                             contract=contract)
+
+        run_provisioning_job(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ProvisioningJob.Status.DONE)
+        self.assertIsNotNone(job.started_at)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(contract.gardens.count(), 10)
+
+    @patch('contract.jobs.provision_contract')
+    def test_run_provisioning_job_failure(self, patched_provision):
+        """Test a failing job is marked failed with the error."""
+        patched_provision.side_effect = ValueError('boom')
+        contract = Contract.objects.create(user=self.user,
+                                           name='contract', level=1)
+        job = ProvisioningJob.objects.create(user=self.user,
+                                             contract=contract)
+
+        with self.assertLogs('contract.jobs', 'ERROR') as logs:
+            run_provisioning_job(job.id)
+
+        self.assertIn('boom', logs.output[0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, ProvisioningJob.Status.FAILED)
+        self.assertEqual(job.error, 'boom')
+        self.assertIsNone(job.contract)
+        self.assertFalse(Contract.objects.filter(id=contract.id).exists())
+
+    @patch('contract.jobs.provision_contract')
+    def test_failed_contract_name_reusable(self, patched_provision):
+        """Test the name of a contract whose job failed can be reused."""
+        patched_provision.side_effect = ValueError('boom')
+        payload = {'name': 'new contract', 'level': 1}
+        response = self.client.post(CONTRACTS_URL, payload, format='json')
+        with self.assertLogs('contract.jobs', 'ERROR'):
+            run_provisioning_job(response.data['id'])
+
+        self.assertFalse(self.client.get(CONTRACTS_URL).data['result'])
+        retry = self.client.post(CONTRACTS_URL, payload, format='json')
+        self.assertEqual(retry.status_code, status.HTTP_202_ACCEPTED)
+
+    @patch('contract.jobs.provision_contract')
+    def test_job_runs_once(self, patched_provision):
+        """Test a job that is no longer pending is not run again."""
+        contract = Contract.objects.create(user=self.user,
+                                           name='contract', level=1)
+        job = ProvisioningJob.objects.create(
+            user=self.user, contract=contract,
+            status=ProvisioningJob.Status.RUNNING)
+
+        run_provisioning_job(job.id)
+
+        patched_provision.assert_not_called()
+
+    @patch('contract.jobs.get_executor')
+    def test_resume_pending_jobs(self, patched_executor):
+        """Test pending jobs are scheduled again when a server starts."""
+        contract = Contract.objects.create(user=self.user, name='contract')
+        pending = ProvisioningJob.objects.create(user=self.user,
+                                                 contract=contract)
+        ProvisioningJob.objects.create(user=self.user, contract=contract,
+                                       status=ProvisioningJob.Status.DONE)
+        executor = patched_executor.return_value = Mock()
+
+        resume_pending_jobs()
+
+        executor.submit.assert_called_once_with(run_provisioning_job,
+                                                pending.id)
+
+    @override_settings(CONTRACT_PROVISIONING_STALE_AFTER=600)
+    @patch('contract.jobs.get_executor')
+    def test_resume_stale_running_jobs(self, patched_executor):
+        """Test jobs left running by a killed process are run again."""
+        contract = Contract.objects.create(user=self.user, name='contract')
+        now = timezone.now()
+        stale, running = [
+            ProvisioningJob.objects.create(
+                user=self.user, contract=contract,
+                status=ProvisioningJob.Status.RUNNING,
+                started_at=now - timedelta(seconds=age))
+            for age in (601, 10)
+        ]
+        executor = patched_executor.return_value = Mock()
+
+        resume_pending_jobs()
+
+        executor.submit.assert_called_once_with(run_provisioning_job,
+                                                stale.id)
+        stale.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(stale.status, ProvisioningJob.Status.PENDING)
+        self.assertEqual(running.status, ProvisioningJob.Status.RUNNING)
+
+        with patch('contract.jobs.provision_contract'):
+            run_provisioning_job(stale.id)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, ProvisioningJob.Status.DONE)
+
+    def test_jobs_limited_to_user(self):
+        """Test job list is limited to authenticated user."""
+        other_user = create_user(email='other@example.com')
+        for user in (self.user, other_user):
+            contract = Contract.objects.create(user=user, name='contract')
+            ProvisioningJob.objects.create(user=user, contract=contract)
+
+        response = self.client.get(JOBS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(
+            response.data[0]['contract'],
+            Contract.objects.get(user=self.user).id,
+        )
+
+
+@override_settings(CONTRACT_PROVISIONING_ASYNC=True)
+class ProvisioningJobExecutionTests(TransactionTestCase):
+    """Test provisioning jobs run on the background executor."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_job_completes_in_background(self):
+        """Test polling the job until the contract is provisioned."""
+        payload = {'name': 'new contract', 'level': 1}
+        response = self.client.post(CONTRACTS_URL, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        url = job_url(response.data['id'])
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            job_response = self.client.get(url)
+            if job_response.data['status'] in ('done', 'failed'):
+                break
+            time.sleep(0.05)
+
+        self.assertEqual(job_response.data['status'], 'done')
+        contract = Contract.objects.get(id=job_response.data['contract'])
+        self.assertEqual(contract.gardens.count(), 10)
@@ -0,0 +1,119 @@
+"""
+Tests for the row serializers.
+"""
+from django.contrib.auth import get_user_model
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from core.models import (
+    Contract,
+    Garden,
+    Plant,
+)
+
+from contract.cache import contract_cache
+from contract.provisioning import provision_contract
+from contract.rows import row_serializer
+from contract.serializers import PlantSerializer
+
+
+class PlantNameSerializer(serializers.ModelSerializer):
+    """Serializer with a field the row serializers cannot compile."""
+
+    upper_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Plant
+        fields = ['id', 'upper_name']
+
+    def get_upper_name(self, plant):
+        return plant.name.upper()
+
+
+class RowSerializerTests(TestCase):
+    """Test row serializers render the same bytes as DRF."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.contract = Contract.objects.create(
+            user=self.user, name='contract', description='text', level=1)
+        provision_contract(self.contract)
+        Plant.objects.create(user=self.user, name='no garden', health=2)
+
+    def get(self, url, params=None):
+        """Return content of url with and without row serializers."""
+        contents = []
+        for enabled in (True, False):
+            contract_cache.invalidate_user(self.user.id)
+            with override_settings(FAST_SERIALIZERS=enabled):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                contents.append(
+                    b''.join(response.streaming_content)
+                    if response.streaming else response.content)
+        return contents
+
+    def assertSameContent(self, url, params=None):
+        fast, drf = self.get(url, params)
+        self.assertEqual(fast, drf)
+
+    def test_contracts(self):
+        """Test contract list, detail and stream are unchanged."""
+        detail = reverse('contract:contract-detail', args=[self.contract.id])
+        self.assertSameContent(reverse('contract:contract-list'))
+        self.assertSameContent(reverse('contract:contract-list'),
+                               {'stream': 'true'})
+        self.assertSameContent(detail)
+        self.assertSameContent(detail, {'fields': 'name,gardens.plants'})
+        self.assertSameContent(detail, {'expand': 'gardens'})
+
+    def test_gardens(self):
+        """Test garden list, detail and search are unchanged."""
+        garden = Garden.objects.filter(user=self.user).first()
+        self.assertSameContent(reverse('contract:garden-list'),
+                               {'page_size': 3})
+        self.assertSameContent(
+            reverse('contract:garden-detail', args=[garden.id]))
+        self.assertSameContent(reverse('contract:garden-list'),
+                               {'name': 'contr'})
+
+    def test_plants(self):
+        """Test plant list and stream are unchanged in both id formats."""
+        for compat in (True, False):
+            with override_settings(PLANT_GARDEN_ID_COMPAT=compat):
+                self.assertSameContent(reverse('contract:plant-list'))
+                self.assertSameContent(reverse('contract:plant-list'),
+                                       {'stream': 'true', 'health__gt': 1})
+
+    def test_pages(self):
+        """Test later pages are unchanged."""
+        response = self.client.get(reverse('contract:plant-list'),
+                                   {'page_size': 7})
+
+        self.assertSameContent(response.data['next'])
+
+    def test_detail_not_found(self):
+        """Test details of other users are not found."""
+        other = get_user_model().objects.create_user('other@example.com')
+        contract = Contract.objects.create(user=other, name='contract')
+
+        response = self.client.get(
+            reverse('contract:contract-detail', args=[contract.id]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_fallback(self):
+        """Test unsupported serializers and the switch fall back to DRF."""
+        self.assertIsNotNone(row_serializer(PlantSerializer()))
+        self.assertIsNone(row_serializer(PlantNameSerializer()))
+        with override_settings(FAST_SERIALIZERS=False):
+            self.assertIsNone(row_serializer(PlantSerializer()))
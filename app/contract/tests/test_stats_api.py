@@ -0,0 +1,98 @@
+"""
+Tests for the garden and contract statistics APIs.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Contract,
+    Garden,
+    Plant,
+)
+
+
+def garden_stats_url(garden_id):
+    """Create and return garden stats URL."""
+    return reverse('contract:garden-stats', args=[garden_id])
+
+
+def contract_stats_url(contract_id):
+    """Create and return contract stats URL."""
+    return reverse('contract:contract-stats', args=[contract_id])
+
+
+def create_user(email='user@example.com', password='testpass123'):
+    """Create and return user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_garden(user, healths, name='garden'):
+    """Create and return garden with one plant per health value."""
+    garden = Garden.objects.create(user=user, name=name)
+    for health in healths:
+        plant = Plant.objects.create(user=user, garden_id=garden.id,
+                                     name='plant', health=health)
+        garden.plants.add(plant)
+    return garden
+
+
+class StatsApiTests(TestCase):
+    """Test aggregated plant metrics."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_garden_stats(self):
+        """Test garden stats aggregate metrics in one query."""
+        garden = create_garden(self.user, [1, 2, 3, 4, 5])
+
+        # garden, aggregate
+        with self.assertNumQueries(2):
+            response = self.client.get(garden_stats_url(garden.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['plants'], 5)
+        health = response.data['metrics']['health']
+        self.assertEqual(health['mean'], 3)
+        self.assertEqual(health['min'], 1)
+        self.assertEqual(health['max'], 5)
+        self.assertEqual(health['p50'], 3)
+        self.assertAlmostEqual(health['p90'], 4.6)
+        self.assertEqual(response.data['metrics']['disease']['max'], 0)
+
+    def test_contract_stats(self):
+        """Test contract stats aggregate the plants of all gardens."""
+        contract = Contract.objects.create(user=self.user, name='contract')
+        contract.gardens.add(create_garden(self.user, [1, 2]),
+                             create_garden(self.user, [3, 10]))
+        create_garden(self.user, [100])
+
+        response = self.client.get(contract_stats_url(contract.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['plants'], 4)
+        self.assertEqual(response.data['metrics']['health']['mean'], 4)
+        self.assertEqual(response.data['metrics']['health']['max'], 10)
+
+    def test_empty_garden_stats(self):
+        """Test stats of a garden without plants."""
+        garden = create_garden(self.user, [])
+
+        response = self.client.get(garden_stats_url(garden.id))
+
+        self.assertEqual(response.data['plants'], 0)
+        self.assertIsNone(response.data['metrics']['health']['mean'])
+
+    def test_other_user_garden_stats_not_found(self):
+        """Test stats of another user's garden are not returned."""
+        garden = create_garden(create_user('other@example.com'), [1])
+
+        response = self.client.get(garden_stats_url(garden.id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
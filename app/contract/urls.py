@@ -14,6 +14,7 @@ router = DefaultRouter()
 router.register('contracts', views.ContractViewSet)
 router.register('gardens', views.GardenViewSet)
 router.register('plants', views.PlantViewSet)
+router.register('jobs', views.ProvisioningJobViewSet)
 
 app_name = 'contract'
 
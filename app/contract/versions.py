@@ -0,0 +1,59 @@
+"""
+Version counters of gardens and contracts.
+
+A change of a plant advances the version and updated_at of its garden, a
+change of a garden those of its contracts, so the version of a contract
+describes its whole tree. Only changes of serialized fields count: metric
+updates, from bulk updates or telemetry, leave the versions alone.
+"""
+import threading
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import (
+    Contract,
+    Garden,
+)
+
+
+def touch_contracts(contract_ids):
+    """Advance the versions of contracts, ids or a queryset of ids."""
+    Contract.objects.filter(id__in=contract_ids).update(
+        version=F('version') + 1, updated_at=timezone.now())
+
+
+def touch_gardens(garden_ids):
+    """Advance the versions of gardens and of the contracts holding them."""
+    garden_ids = {garden_id for garden_id in garden_ids if garden_id}
+    if not garden_ids:
+        return
+    Garden.objects.filter(id__in=garden_ids).update(
+        version=F('version') + 1, updated_at=timezone.now())
+    touch_contracts(Contract.gardens.through.objects.filter(
+        garden_id__in=garden_ids).values('contract_id'))
+
+
+_pending = threading.local()
+
+
+def touch_gardens_on_commit(garden_ids):
+    """Advance gardens and their contracts once the transaction commits.
+
+    The ids of a transaction are collected, so deleting many plants, as
+    deleting their user does, advances each garden once with two queries.
+    Ids left by a rolled back transaction are advanced with the next one.
+    """
+    pending = getattr(_pending, 'garden_ids', None)
+    if pending is None:
+        pending = _pending.garden_ids = set()
+    pending.update(garden_ids)
+    transaction.on_commit(_touch_pending_gardens)
+
+
+def _touch_pending_gardens():
+    garden_ids = getattr(_pending, 'garden_ids', None)
+    _pending.garden_ids = None
+    if garden_ids:
+        touch_gardens(garden_ids)
@@ -1,12 +1,20 @@
 """
 Views for the contract APIs.
 """
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Prefetch,
+    prefetch_related_objects,
+)
+from django.urls import reverse
+
 from rest_framework import (
     viewsets,
     mixins,
 )
 
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
@@ -15,22 +23,71 @@ from core.models import (
     Contract,
     Garden,
     Plant,
+    ProvisioningJob,
 )
 
 from contract import serializers
+from contract.conditional import ConditionalGetMixin
+from contract.projection import (
+    ProjectedViewMixin,
+    projected_columns,
+)
+from contract.pagination import (
+    ContractPagination,
+    GardenPagination,
+    PlantPagination,
+)
+from contract.rows import RowSerializerMixin
+from contract.stats import plant_stats
+from contract.streaming import StreamingListMixin
+from user.authentication import CachedTokenAuthentication
+from contract.cache import contract_cache
+from contract.filters import filter_plants
+from contract.jobs import enqueue_provisioning_job
+
 
+def plants_prefetch(lookup, serializer):
+    """Return prefetch of plants loading only the serialized fields."""
+    return Prefetch(
+        lookup,
+        queryset=Plant.objects.only(*projected_columns(serializer, 'garden')),
+    )
 
-class ContractViewSet(viewsets.ModelViewSet):
+
+class ContractViewSet(ConditionalGetMixin,
+                      ProjectedViewMixin,
+                      RowSerializerMixin,
+                      StreamingListMixin,
+                      viewsets.ModelViewSet):
     """View for manage contract APIs."""
     serializer_class = serializers.ContractDetailSerializer
     queryset = Contract.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = ContractPagination
     http_method_names = ['get', 'post', 'list', 'delete']
 
+    def get_prefetch_plan(self):
+        """Return the prefetches of the nested gardens and plants."""
+        gardens = self.get_serializer().fields.get('gardens')
+        if gardens is None:
+            return []
+        plan = [Prefetch('gardens', queryset=Garden.objects.only(
+            *projected_columns(gardens)))]
+        plants = gardens.child.fields.get('plants')
+        if plants is not None:
+            plan.append(plants_prefetch('gardens__plant_set', plants))
+        return plan
+
     def get_queryset(self):
         """Retrieve contracts for authenticated user."""
-        return self.queryset.filter(user=self.request.user).order_by('-id')
+        queryset = self.queryset.filter(
+            user=self.request.user).order_by('-id')
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(
+                *projected_columns(self.get_serializer())).prefetch_related(
+                *self.get_prefetch_plan())
+        return queryset
 
     def get_serializer_class(self):
         """Return the serializer class for request."""
@@ -41,18 +98,85 @@ class ContractViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Create new contract."""
-        serializer.save(user=self.request.user)
+        contract = serializer.save(user=self.request.user)
+        prefetch_related_objects([contract], *self.get_prefetch_plan())
+
+    def create(self, request, *args, **kwargs):
+        """Create contract, provisioning it in the background if enabled."""
+        if not settings.CONTRACT_PROVISIONING_ASYNC:
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            contract = serializer.save(user=request.user, provision=False)
+            job = ProvisioningJob.objects.create(user=request.user,
+                                                 contract=contract)
+            enqueue_provisioning_job(job)
+
+        job_url = reverse('contract:provisioningjob-detail', args=[job.id])
+        return Response(
+            data=serializers.ProvisioningJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': job_url},
+        )
+
+    def get_stream_prefetch_plan(self):
+        return self.get_prefetch_plan()
+
+    def cached_response(self, key_parts, get_response):
+        """Return cached payload for key_parts or cache a fresh one.
+
+        The validators are read first and cached with the payload, which is
+        served only while they match, so a stale entry is neither sent nor
+        answered with 304.
+        """
+        key = contract_cache.make_key(self.request.user.id, *key_parts)
+        validators = self.get_validators()
+
+        def cached_or_fresh_response():
+            cached = contract_cache.get(key)
+            if cached is not None and cached[1] == validators:
+                return Response(data=cached[0], headers={'X-Cache': 'HIT'})
+            response = get_response()
+            if response.status_code == status.HTTP_200_OK:
+                contract_cache.set(key, (response.data, validators))
+            response['X-Cache'] = 'MISS'
+            return response
+
+        return self.conditional_response(validators, cached_or_fresh_response)
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = serializers.ContractSerializer(queryset, many=True)
-        response = {
-            "result": serializer.data
-        }
-        return Response(data=response, status=status.HTTP_200_OK)
+        if self.should_stream():
+            return self.conditional_response(
+                self.get_validators(),
+                lambda: self.stream_list(self.get_queryset(),
+                                         serializers.ContractSerializer))
+
+        return self.cached_response(
+            ['list', request.build_absolute_uri()],
+            lambda: super(ContractViewSet, self).list(
+                request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        projection = self.get_projection()
+        return self.cached_response(
+            ['detail', kwargs['pk'], projection.key if projection else ''],
+            lambda: super(ContractViewSet, self).retrieve(
+                request, *args, **kwargs))
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Return aggregated plant metrics of the contract."""
+        contract = self.get_object()
+        plants = Plant.objects.filter(garden__contract=contract)
+        return Response(plant_stats(plants), status=status.HTTP_200_OK)
 
 
-class GardenViewSet(mixins.ListModelMixin,
+class GardenViewSet(ConditionalGetMixin,
+                    ProjectedViewMixin,
+                    RowSerializerMixin,
+                    mixins.ListModelMixin,
                     mixins.RetrieveModelMixin,
                     mixins.UpdateModelMixin,
                     mixins.DestroyModelMixin,
@@ -60,25 +184,117 @@ class GardenViewSet(mixins.ListModelMixin,
     """Manage gardens in the database."""
     serializer_class = serializers.GardenSerializer
     queryset = Garden.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = GardenPagination
+    row_columns = ['name']
+
+    def get_row_serializer(self):
+        """Leave name searches to DRF, which lists them without plants."""
+        if 'name' in self.request.query_params:
+            return None
+        return super().get_row_serializer()
+
+    def is_search_without_plants(self):
+        """Return whether a name search lists gardens without plants.
+
+        Name searches list bare rows unless the projection asks for plants.
+        """
+        if 'name' not in self.request.query_params:
+            return False
+        projection = self.get_projection()
+        return projection is None or not projection.lists('plants')
+
+    def get_prefetch_plan(self):
+        """Return the prefetches of the nested plants."""
+        plants = self.get_serializer().fields.get('plants')
+        if plants is None:
+            return []
+        return [plants_prefetch('plant_set', plants)]
 
     def get_queryset(self):
         queryset = self.queryset.filter(
             user=self.request.user).order_by('-name')
         garden_by_contract_name = self.request.query_params.get("name")
         if garden_by_contract_name is not None:
-            queryset = queryset.filter(
-                name__icontains=garden_by_contract_name).values()
+            queryset = queryset.filter(name__icontains=garden_by_contract_name)
+            if self.is_search_without_plants():
+                return queryset.values(
+                    *projected_columns(self.get_serializer(), 'name'))
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(
+                *projected_columns(self.get_serializer(), 'name'))
+        if self.action not in ('destroy', 'stats'):
+            queryset = queryset.prefetch_related(*self.get_prefetch_plan())
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_validators(),
+            lambda: super(GardenViewSet, self).list(
+                request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_validators(),
+            lambda: super(GardenViewSet, self).retrieve(
+                request, *args, **kwargs))
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Return aggregated plant metrics of the garden."""
+        garden = self.get_object()
+        plants = Plant.objects.filter(garden=garden)
+        return Response(plant_stats(plants), status=status.HTTP_200_OK)
+
 
-class PlantViewSet(mixins.ListModelMixin,
+class PlantViewSet(ProjectedViewMixin,
+                   RowSerializerMixin,
+                   StreamingListMixin,
+                   mixins.ListModelMixin,
                    mixins.DestroyModelMixin,
                    mixins.UpdateModelMixin,
                    viewsets.GenericViewSet):
     """Manage plants in the database."""
     serializer_class = serializers.PlantSerializer
     queryset = Plant.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = PlantPagination
+
+    def get_queryset(self):
+        """Retrieve plants of authenticated user, filtered when listing."""
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action == 'list':
+            return filter_plants(queryset, self.request.query_params).only(
+                *projected_columns(self.get_serializer()))
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if self.should_stream():
+            return self.stream_list(self.get_queryset().order_by('-id'),
+                                    self.get_serializer_class())
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['patch'], url_path='bulk',
+            url_name='bulk-update',
+            serializer_class=serializers.PlantBulkUpdateSerializer)
+    def bulk_update(self, request):
+        """Update the metrics of many plants in one request."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        plants = serializer.save(user=request.user)
+        return Response({'updated': len(plants)}, status=status.HTTP_200_OK)
+
+
+class ProvisioningJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Report the status of contract provisioning jobs."""
+    serializer_class = serializers.ProvisioningJobSerializer
+    queryset = ProvisioningJob.objects.all()
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Retrieve provisioning jobs for authenticated user."""
+        return self.queryset.filter(
+            user=self.request.user).order_by('-created_at')
@@ -0,0 +1,95 @@
+"""
+ASGI handler for serving the APIs.
+"""
+import asyncio
+
+from asgiref.sync import (
+    ThreadSensitiveContext,
+    sync_to_async,
+)
+
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler as DjangoASGIHandler
+from django.db import connections
+from django.http import HttpResponse
+
+
+class ResponseHead(HttpResponse):
+    """Status, headers and cookies of a streamed response, without content.
+
+    Lets Django encode the start message of a response streamed here.
+    """
+
+    def __init__(self, response):
+        super().__init__(status=response.status_code,
+                         headers=response.headers)
+        self.cookies = response.cookies
+
+    def close(self):
+        """Leave closing, and the request_finished signal, to the response."""
+
+
+class ASGIHandler(DjangoASGIHandler):
+    """ASGI handler running every request on a thread of its own.
+
+    Django 3.2 runs all synchronous views on one shared thread and reads
+    streaming responses inside the event loop, where their database
+    queries are not allowed. Here each request gets its own thread for
+    the view and for producing streamed chunks, which is idle while a
+    chunk is sent to a slow client. At most max_threads requests, by
+    default ASGI_MAX_THREADS, are served at once.
+    """
+
+    def __init__(self, max_threads=None):
+        super().__init__()
+        self.max_threads = max_threads or settings.ASGI_MAX_THREADS
+        self._threads = None
+
+    async def __call__(self, scope, receive, send):
+        if self._threads is None:
+            # Created on the loop serving the requests.
+            self._threads = asyncio.Semaphore(self.max_threads)
+        async with self._threads, ThreadSensitiveContext():
+            try:
+                await super().__call__(scope, receive, send)
+            finally:
+                # The request thread ends with the request, so its
+                # connections cannot be reused. Pooled ones go back to
+                # the pool.
+                await sync_to_async(
+                    connections.close_all, thread_sensitive=True)()
+
+    async def send_response(self, response, send):
+        """Send response, reading streamed parts on the request thread."""
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        async def send_start(message):
+            if message['type'] == 'http.response.start':
+                await send(message)
+
+        await super().send_response(ResponseHead(response), send_start)
+
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while True:
+            part = await next_part(parts, None)
+            if part is None:
+                break
+            for chunk, _ in self.chunk_bytes(part):
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                })
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+
+def get_asgi_application():
+    """Set up Django, resume pending jobs and return the ASGI application."""
+    django.setup(set_prefix=False)
+    from contract.jobs import resume_pending_jobs
+    resume_pending_jobs()
+    return ASGIHandler()
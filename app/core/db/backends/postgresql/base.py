@@ -0,0 +1,114 @@
+"""
+PostgreSQL backend with connection health checks and pooling.
+
+Set ``CONN_HEALTH_CHECKS`` in a database's settings to check persistent
+connections before their first use in a request, and ``POOL`` to a dict
+with ``MAX_SIZE`` and ``TIMEOUT`` to share a pool of connections between
+the threads of a process.
+"""
+import threading
+
+from django.db.backends.postgresql import base
+
+from core.db.pool import ConnectionPool
+from core.metrics import Callback
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(settings_dict):
+    """Return the connection pool of the database in settings_dict."""
+    key = tuple(settings_dict.get(name)
+                for name in ('HOST', 'PORT', 'NAME', 'USER'))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            options = settings_dict['POOL']
+            pool = _pools[key] = ConnectionPool(
+                max_size=options['MAX_SIZE'],
+                timeout=options.get('TIMEOUT', 10),
+            )
+        return pool
+
+
+def close_pools():
+    """Close the idle connections of every pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.closeall()
+
+
+def pool_stats(name):
+    """Return the sum of stat name over all pools."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return sum(pool.stats()[name] for pool in pools)
+
+
+Callback('db_pool_connections', 'Pooled database connections by state.',
+         ['state'], lambda: {(state,): pool_stats(state)
+                             for state in ('checked_out', 'idle')})
+Callback('db_pool_waits', 'Checkouts that waited for a connection.', [],
+         lambda: {(): pool_stats('waits')}, kind='counter')
+Callback('db_pool_wait_seconds', 'Time spent waiting for a connection.', [],
+         lambda: {(): pool_stats('wait_time')}, kind='counter')
+Callback('db_pool_timeouts', 'Checkouts that timed out.', [],
+         lambda: {(): pool_stats('timeouts')}, kind='counter')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_enabled = self.settings_dict.get(
+            'CONN_HEALTH_CHECKS', False)
+        self.health_check_done = False
+
+    @property
+    def pool(self):
+        """Return the connection pool, or None if pooling is off."""
+        if not self.settings_dict.get('POOL'):
+            return None
+        return get_pool(self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        return pool.getconn(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params))
+
+    def _close(self):
+        pool = self.pool
+        if self.connection is None or pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def close_if_health_check_failed(self):
+        """Close the connection if it is no longer usable.
+
+        Runs once per request, before the connection is first used.
+        """
+        if (self.connection is None or not self.health_check_enabled or
+                self.health_check_done):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        if self.connection is not None:
+            self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
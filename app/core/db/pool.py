@@ -0,0 +1,122 @@
+"""
+In-process pool of database connections.
+"""
+import threading
+import time
+
+import psycopg2
+from psycopg2.extensions import (
+    TRANSACTION_STATUS_IDLE,
+    TRANSACTION_STATUS_UNKNOWN,
+)
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """Raised when no connection is returned to a full pool in time."""
+
+
+class ConnectionPool:
+    """Pool holding at most max_size connections of one process.
+
+    Checking out a connection reuses an idle one, opens a new one while
+    the pool is below max_size, and otherwise waits up to timeout seconds
+    for one to be returned.
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = []
+        self._size = 0
+        self._checked_out = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._condition = threading.Condition()
+
+    def getconn(self, connect):
+        """Check out a connection, opening it with connect if needed."""
+        connection = None
+        waiting_since = None
+        with self._condition:
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                if waiting_since is None:
+                    waiting_since = time.monotonic()
+                    self._waits += 1
+                remaining = self.timeout - (time.monotonic() - waiting_since)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._wait_time += time.monotonic() - waiting_since
+                    raise PoolTimeout(
+                        f'no database connection available after '
+                        f'{self.timeout}s, the pool holds {self.max_size}')
+                self._condition.wait(remaining)
+            if waiting_since is not None:
+                self._wait_time += time.monotonic() - waiting_since
+            self._checked_out += 1
+
+        if connection is None:
+            try:
+                connection = connect()
+            except BaseException:
+                self._discard()
+                raise
+        return connection
+
+    def putconn(self, connection):
+        """Return connection, closing it if it cannot be reused."""
+        reusable = not connection.closed
+        if reusable:
+            status = connection.info.transaction_status
+            if status == TRANSACTION_STATUS_UNKNOWN:
+                reusable = False
+            elif status != TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    reusable = False
+        if not reusable:
+            try:
+                connection.close()
+            except psycopg2.Error:
+                pass
+            self._discard()
+            return
+
+        with self._condition:
+            self._checked_out -= 1
+            self._idle.append(connection)
+            self._condition.notify()
+
+    def _discard(self):
+        with self._condition:
+            self._checked_out -= 1
+            self._size -= 1
+            self._condition.notify()
+
+    def closeall(self):
+        """Close every idle connection."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for connection in idle:
+            connection.close()
+
+    def stats(self):
+        """Return the pool size, checked out connections and waits."""
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'checked_out': self._checked_out,
+                'waits': self._waits,
+                'wait_time': self._wait_time,
+                'timeouts': self._timeouts,
+            }
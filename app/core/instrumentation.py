@@ -0,0 +1,176 @@
+"""
+Request level SQL and latency instrumentation.
+"""
+import contextvars
+import json
+import logging
+import random
+import time
+from contextlib import (
+    ExitStack,
+    contextmanager,
+)
+
+from django.conf import settings
+from django.db import connections
+
+from rest_framework.serializers import ListSerializer
+
+from core.metrics import (
+    REQUEST_DURATION,
+    registry,
+)
+
+logger = logging.getLogger(__name__)
+
+_recorder = contextvars.ContextVar('instrumentation_recorder', default=None)
+
+
+class Recorder:
+    """Timings of one sampled request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.spans = {}
+        self.open_spans = set()
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Count the queries of the request and the time spent in them."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+@contextmanager
+def span(name):
+    """Add the time spent in the block to the current request.
+
+    Nested spans of the same name are only counted once.
+    """
+    recorder = _recorder.get()
+    if recorder is None or name in recorder.open_spans:
+        yield
+        return
+    recorder.open_spans.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(name, time.perf_counter() - started)
+        recorder.open_spans.discard(name)
+
+
+class TimedSerializerMixin:
+    """Serializer recording the time spent producing data as `serialize`.
+
+    Lists of it are timed when Meta.list_serializer_class is
+    TimedListSerializer.
+    """
+
+    @property
+    def data(self):
+        with span('serialize'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, ListSerializer):
+    """List serializer recording the time spent producing data."""
+
+
+class InstrumentationMiddleware:
+    """Record wall, SQL, auth, serializer and render time of requests.
+
+    The wall time of every request goes to the latency histogram of its
+    route.
+
+    Sampled requests get a `Server-Timing` header and a structured log
+    line. Requests over the query or latency budget are logged as
+    warnings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = settings.INSTRUMENTATION
+
+    def __call__(self, request):
+        registry.check_process()
+        if random.random() >= self.options['SAMPLE_RATE']:
+            started = time.perf_counter()
+            response = self.get_response(request)
+            elapsed = time.perf_counter() - started
+            self.observe(request, elapsed)
+            if elapsed * 1000 > self.options['LATENCY_BUDGET_MS']:
+                self.log(request, response, elapsed, None)
+            return response
+
+        recorder = Recorder()
+        token = _recorder.set(recorder)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(recorder.execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        elapsed = time.perf_counter() - started
+        self.observe(request, elapsed)
+
+        response['Server-Timing'] = self.server_timing(recorder, elapsed)
+        self.log(request, response, elapsed, recorder)
+        return response
+
+    def observe(self, request, elapsed):
+        """Add the request to the latency histogram of its route."""
+        match = request.resolver_match
+        REQUEST_DURATION.observe(
+            elapsed, match.view_name if match else 'unmatched',
+            request.method)
+
+    def process_template_response(self, request, response):
+        """Time the rendering that follows this hook."""
+        recorder = _recorder.get()
+        if recorder is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda response: recorder.add(
+                'render', time.perf_counter() - started))
+        return response
+
+    def server_timing(self, recorder, elapsed):
+        metrics = [f'total;dur={elapsed * 1000:.1f}',
+                   f'sql;dur={recorder.sql_time * 1000:.1f};'
+                   f'desc="{recorder.queries} queries"']
+        metrics += [f'{name};dur={seconds * 1000:.1f}'
+                    for name, seconds in recorder.spans.items()]
+        return ', '.join(metrics)
+
+    def log(self, request, response, elapsed, recorder):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 1),
+        }
+        over_budget = []
+        if elapsed * 1000 > self.options['LATENCY_BUDGET_MS']:
+            over_budget.append('latency')
+        if recorder is not None:
+            record['queries'] = recorder.queries
+            record['sql_ms'] = round(recorder.sql_time * 1000, 1)
+            for name, seconds in recorder.spans.items():
+                record[f'{name}_ms'] = round(seconds * 1000, 1)
+            if recorder.queries > self.options['QUERY_BUDGET']:
+                over_budget.append('queries')
+        if over_budget:
+            record['over_budget'] = over_budget
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
@@ -0,0 +1,207 @@
+"""
+Django command to benchmark the contract and user APIs.
+"""
+import itertools
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from contract.cache import contract_cache
+from core.models import Contract
+
+LEVELS = [1, 2, 3]
+PASSWORD = 'benchmark-password'
+
+
+def percentile(values, percent):
+    """Return the nearest rank percentile of values."""
+    ordered = sorted(values)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def git_commit():
+    """Return the commit of the working tree, if it is a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Seed users with contracts of levels 1 to 3 in the configured '
+            'database, measure latency, queries and peak memory of the API '
+            'hot paths and write the results as JSON. Everything created is '
+            'removed afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2)
+        parser.add_argument('--contracts-per-level', type=int, default=2)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--compare',
+                            help='Earlier results to compare against.')
+
+    def handle(self, *args, **options):
+        prefix = f'benchmark-{uuid.uuid4().hex[:8]}'
+        users = []
+        try:
+            for i in range(options['users']):
+                user = get_user_model().objects.create_user(
+                    f'{prefix}-{i}@example.com', PASSWORD)
+                users.append((user, Token.objects.create(user=user)))
+            results = self.run(users, options)
+        finally:
+            for user, _ in users:
+                user.delete()
+
+        report = {
+            'commit': git_commit(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'options': {key: options[key] for key in (
+                'users', 'contracts_per_level', 'iterations')},
+            'results': results,
+        }
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+        self.print_results(results, options.get('compare'))
+        self.stdout.write(f'results written to {options["output"]}')
+
+    def client(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+
+    def run(self, users, options):
+        iterations = options['iterations']
+        results = {}
+
+        # Creating the contracts is the first benchmark and seeds the rest.
+        seeds = [
+            (user, token, level)
+            for user, token in users
+            for level in LEVELS
+            for _ in range(options['contracts_per_level'])
+        ]
+        names = itertools.count()
+
+        def create(seed):
+            user, token, level = seed
+            return self.client(token).post(
+                reverse('contract:contract-list'),
+                {'name': f'contract {next(names)}', 'level': level},
+                format='json')
+        results['contract-create'] = self.measure(create, seeds)
+
+        user, token = users[0]
+        client = self.client(token)
+        contracts = list(Contract.objects.filter(user=user).order_by('level')
+                         .values_list('id', flat=True))
+
+        def uncached(path, params=None):
+            def request(_):
+                contract_cache.invalidate_user(user.id)
+                return client.get(path, params)
+            return request
+
+        def cached(path, params=None):
+            return lambda _: client.get(path, params)
+
+        contract_list = reverse('contract:contract-list')
+        contract_detail = reverse('contract:contract-detail',
+                                  args=[contracts[-1]])
+        paths = {
+            'contract-list': uncached(contract_list),
+            'contract-list-cached': cached(contract_list),
+            'contract-detail': uncached(contract_detail),
+            'contract-detail-cached': cached(contract_detail),
+            'contract-detail-names': uncached(contract_detail,
+                                              {'fields': 'id,name'}),
+            'garden-list': cached(reverse('contract:garden-list')),
+            'garden-search': cached(reverse('contract:garden-list'),
+                                    {'name': 'tract 1'}),
+            'plant-list': cached(reverse('contract:plant-list')),
+            'token-auth': cached(reverse('user:me')),
+        }
+        for name, request in paths.items():
+            results[name] = self.measure(request, range(iterations))
+
+        def create_token(_):
+            return APIClient().post(reverse('user:token'), {
+                'email': user.email, 'password': PASSWORD})
+        results['token-create'] = self.measure(
+            create_token, range(iterations))
+        return results
+
+    def measure(self, request, items):
+        """Return latency, query and memory statistics of request.
+
+        Latency is measured first on its own, then every request runs
+        again with query capturing and memory tracing.
+        """
+        items = list(items)
+        request(items[0])
+        latencies = []
+        for item in items:
+            started = time.perf_counter()
+            response = request(item)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise CommandError(
+                    f'{response.status_code}: {response.content[:200]}')
+
+        queries = []
+        peaks = []
+        for item in items[:10]:
+            tracemalloc.start()
+            with CaptureQueriesContext(connection) as context:
+                request(item)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            queries.append(len(context))
+
+        return {
+            'requests': len(latencies),
+            'mean_ms': statistics.mean(latencies) * 1000,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'queries_per_request': statistics.mean(queries),
+            'peak_memory_kb': max(peaks) / 1024,
+        }
+
+    def print_results(self, results, compare):
+        previous = {}
+        if compare:
+            with open(compare) as file:
+                previous = json.load(file)['results']
+        self.stdout.write(
+            f'{"path":<24}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+            f'{"queries":>9}{"peak KB":>10}')
+        for name, result in results.items():
+            line = (f'{name:<24}{result["p50_ms"]:>9.2f}'
+                    f'{result["p95_ms"]:>9.2f}{result["p99_ms"]:>9.2f}'
+                    f'{result["queries_per_request"]:>9.1f}'
+                    f'{result["peak_memory_kb"]:>10.0f}')
+            if name in previous:
+                change = result['p50_ms'] / previous[name]['p50_ms'] - 1
+                line += f'  p50 {change:+.0%}'
+            self.stdout.write(line)
@@ -0,0 +1,91 @@
+"""
+Django command to compare the JSON renderer and parser with DRF's.
+"""
+import io
+import random
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from contract.provisioning import provision_contract
+from contract.rows import RowSerializer
+from contract.serializers import ContractDetailSerializer
+from core.management.commands.benchmark_serializers import best_of
+from core.models import (
+    PLANT_MEASURED_FIELDS,
+    Contract,
+)
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+
+class Command(BaseCommand):
+    help = ('Provision contracts and compare rendering their trees and '
+            'parsing them and a bulk plant update with the DRF JSON classes '
+            'and the fast ones. The data is removed afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contracts', type=int, default=5)
+        parser.add_argument('--level', type=int, default=3)
+        parser.add_argument('--plants', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(
+            f'benchmark-{uuid.uuid4().hex[:8]}@example.com')
+        try:
+            for i in range(options['contracts']):
+                provision_contract(Contract.objects.create(
+                    user=user, name=f'benchmark {i}',
+                    level=options['level']))
+            rows = RowSerializer(ContractDetailSerializer())
+            trees = {'result': rows.serialize(
+                rows.values(Contract.objects.filter(user=user)))}
+        finally:
+            user.delete()
+        self.compare(trees, options['plants'], options['repeat'])
+
+    def compare(self, trees, plants, repeat):
+        readings = random.Random(0)
+        bulk_update = {'plants': [
+            dict({'id': i}, **{field: round(readings.uniform(0, 100), 3)
+                               for field in PLANT_MEASURED_FIELDS})
+            for i in range(plants)
+        ]}
+        tree_content = JSONRenderer().render(trees)
+        bulk_content = JSONRenderer().render(bulk_update)
+
+        def parse(parser, content):
+            return lambda: parser.parse(io.BytesIO(content))
+
+        cases = [
+            ('render trees', len(tree_content),
+             lambda: JSONRenderer().render(trees),
+             lambda: FastJSONRenderer().render(trees)),
+            ('render bulk', len(bulk_content),
+             lambda: JSONRenderer().render(bulk_update),
+             lambda: FastJSONRenderer().render(bulk_update)),
+            ('parse trees', len(tree_content),
+             parse(JSONParser(), tree_content),
+             parse(FastJSONParser(), tree_content)),
+            ('parse bulk', len(bulk_content),
+             parse(JSONParser(), bulk_content),
+             parse(FastJSONParser(), bulk_content)),
+        ]
+        self.stdout.write(f'{"case":<16}{"KB":>8}{"drf ms":>10}'
+                          f'{"fast ms":>10}{"speedup":>9}')
+        for name, size, drf, fast in cases:
+            drf_time, drf_result = best_of(repeat, drf)
+            fast_time, fast_result = best_of(repeat, fast)
+            if drf_result != fast_result:
+                raise CommandError(f'{name}: results differ')
+            self.stdout.write(
+                f'{name:<16}{size / 1024:>8.0f}{drf_time * 1000:>10.2f}'
+                f'{fast_time * 1000:>10.2f}{drf_time / fast_time:>8.1f}x')
@@ -0,0 +1,97 @@
+"""
+Django command to compare DRF serializers with their row serializers.
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from django.db.models import prefetch_related_objects
+
+from rest_framework.renderers import JSONRenderer
+
+from contract.provisioning import provision_contract
+from contract.rows import RowSerializer
+from contract.serializers import (
+    ContractDetailSerializer,
+    PlantSerializer,
+)
+from core.models import (
+    Contract,
+    Plant,
+)
+
+
+def best_of(repeat, function):
+    """Return the fastest of repeat timed calls of function and its result."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+class Command(BaseCommand):
+    help = ('Provision a contract and compare serializing it and its plants '
+            'with the DRF serializers and the row serializers. Queries are '
+            'included in the contract tree but not in the plant rows. The '
+            'data is removed afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--level', type=int, default=3)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(
+            f'benchmark-{uuid.uuid4().hex[:8]}@example.com')
+        try:
+            contract = Contract.objects.create(
+                user=user, name='benchmark', level=options['level'])
+            provision_contract(contract)
+            self.compare(contract, options['repeat'])
+        finally:
+            user.delete()
+
+    def compare(self, contract, repeat):
+        plant_fields = PlantSerializer.Meta.fields
+        plants = list(Plant.objects.filter(user=contract.user).only(
+            *plant_fields))
+        plant_rows = RowSerializer(PlantSerializer())
+        rows = list(plant_rows.values(
+            Plant.objects.filter(user=contract.user)))
+
+        def contract_tree():
+            instance = Contract.objects.get(pk=contract.pk)
+            prefetch_related_objects(
+                [instance], 'gardens', 'gardens__plant_set')
+            return ContractDetailSerializer(instance).data
+
+        def contract_rows():
+            row_serializer = RowSerializer(ContractDetailSerializer())
+            row = row_serializer.values(
+                Contract.objects.filter(pk=contract.pk)).get()
+            return row_serializer.serialize([row])[0]
+
+        cases = [
+            ('plant rows', len(plants),
+             lambda: PlantSerializer(plants, many=True).data,
+             lambda: plant_rows.serialize(rows)),
+            ('contract tree', len(plants), contract_tree, contract_rows),
+        ]
+        renderer = JSONRenderer()
+        self.stdout.write(
+            f'{"case":<16}{"rows":>8}{"drf us/row":>12}{"fast us/row":>13}'
+            f'{"speedup":>9}')
+        for name, count, drf, fast in cases:
+            drf_time, drf_data = best_of(repeat, drf)
+            fast_time, fast_data = best_of(repeat, fast)
+            if renderer.render(drf_data) != renderer.render(fast_data):
+                raise CommandError(f'{name}: outputs differ')
+            self.stdout.write(
+                f'{name:<16}{count:>8}{drf_time / count * 1e6:>12.2f}'
+                f'{fast_time / count * 1e6:>13.2f}'
+                f'{drf_time / fast_time:>8.1f}x')
@@ -0,0 +1,131 @@
+"""
+Django command to load test a running API server.
+"""
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+
+def percentile(sorted_values, percent):
+    """Return the nearest rank percentile of sorted_values."""
+    if not sorted_values:
+        return 0
+    index = max(0, round(percent / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = ('Send concurrent GET requests to a running server and report '
+            'throughput and latency, optionally while slow clients read '
+            'streamed responses.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--token', default='')
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--slow-clients', type=int, default=0)
+        parser.add_argument('--slow-url', default='',
+                            help='URL read by the slow clients, '
+                                 'defaults to url.')
+        parser.add_argument('--slow-rate', type=int, default=4096,
+                            help='Bytes per second read by a slow client.')
+
+    def handle(self, *args, **options):
+        for key in ('url', 'slow_url'):
+            if options[key] and urlsplit(options[key]).scheme != 'http':
+                raise CommandError(f'{options[key]} is not an http URL')
+        results = asyncio.run(self.run(options))
+        self.report(results, options)
+
+    async def request(self, url, token, slow_rate=None):
+        """Send GET request and return its status and byte count.
+
+        The status is None when the response has no valid status line.
+        """
+        parts = urlsplit(url)
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or 80)
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+        headers = [f'GET {path} HTTP/1.1', f'Host: {parts.netloc}',
+                   'Connection: close']
+        if token:
+            headers.append(f'Authorization: Token {token}')
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode())
+        try:
+            status_line = await reader.readline()
+            size = len(status_line)
+            while True:
+                data = await reader.read(slow_rate or 65536)
+                if not data:
+                    break
+                size += len(data)
+                if slow_rate:
+                    await asyncio.sleep(1)
+        finally:
+            writer.close()
+        fields = status_line.split()
+        if len(fields) < 2 or not fields[1].isdigit():
+            return None, size
+        return int(fields[1]), size
+
+    async def slow_client(self, url, token, rate, done):
+        """Read url slowly, again and again, until done is set."""
+        while not done.is_set():
+            await self.request(url, token, rate)
+
+    async def run(self, options):
+        url, token = options['url'], options['token']
+        latencies = []
+        statuses = {}
+        remaining = iter(range(options['requests']))
+
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                status_code, _ = await self.request(url, token)
+                latencies.append(time.perf_counter() - started)
+                # Empty and truncated responses count as errors.
+                status = status_code or 'error'
+                statuses[status] = statuses.get(status, 0) + 1
+
+        done = asyncio.Event()
+        slow_clients = [
+            asyncio.ensure_future(self.slow_client(
+                options['slow_url'] or url, token, options['slow_rate'],
+                done))
+            for _ in range(options['slow_clients'])
+        ]
+        # Let the slow clients fill the socket buffers first.
+        if slow_clients:
+            await asyncio.sleep(1)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker()
+                               for _ in range(options['concurrency'])])
+        elapsed = time.perf_counter() - started
+
+        done.set()
+        for client in slow_clients:
+            client.cancel()
+        await asyncio.gather(*slow_clients, return_exceptions=True)
+        return {'latencies': sorted(latencies), 'statuses': statuses,
+                'elapsed': elapsed}
+
+    def report(self, results, options):
+        latencies = results['latencies']
+        self.stdout.write(
+            f'requests: {len(latencies)}, concurrency: '
+            f'{options["concurrency"]}, slow clients: '
+            f'{options["slow_clients"]}')
+        self.stdout.write(f'statuses: {results["statuses"]}')
+        self.stdout.write(
+            f'throughput: {len(latencies) / results["elapsed"]:,.1f} req/s')
+        self.stdout.write('latency: ' + ', '.join(
+            f'p{percent} {percentile(latencies, percent) * 1000:.1f}ms'
+            for percent in (50, 95, 99)))
@@ -0,0 +1,53 @@
+"""
+Django command to prepare the database when a container starts.
+"""
+import time
+from contextlib import contextmanager
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connections,
+)
+from django.db.migrations.executor import MigrationExecutor
+
+
+class Command(BaseCommand):
+    help = ('Wait for the database and apply unapplied migrations, '
+            'reporting how long every phase took.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--timeout', type=float, default=60,
+                            help='Seconds to wait for the database.')
+
+    @contextmanager
+    def phase(self, name):
+        """Report the time spent in the enclosed block."""
+        started = time.monotonic()
+        yield
+        self.stdout.write(f'{name}: {time.monotonic() - started:.3f}s')
+
+    def handle(self, *args, **options):
+        database = options['database']
+        started = time.monotonic()
+
+        with self.phase('wait_for_db'):
+            call_command('wait_for_db', database=database,
+                         timeout=options['timeout'], stdout=self.stdout)
+
+        with self.phase('migration plan'):
+            executor = MigrationExecutor(connections[database])
+            plan = executor.migration_plan(
+                executor.loader.graph.leaf_nodes())
+
+        if plan:
+            with self.phase('migrate'):
+                call_command('migrate', database=database, interactive=False,
+                             stdout=self.stdout)
+        else:
+            self.stdout.write('migrations already applied, skipping migrate')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'startup: {time.monotonic() - started:.3f}s'))
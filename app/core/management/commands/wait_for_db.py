@@ -5,22 +5,51 @@ import time
 
 from psycopg2 import OperationalError as Psycorpg2OpError
 
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connections,
+)
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
 
 
 class Command(BaseCommand):
+    help = ('Wait until a connection to the database can be opened, probing '
+            'with an exponential backoff.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--timeout', type=float, default=60,
+                            help='Seconds to wait in total.')
+        parser.add_argument('--interval', type=float, default=0.05,
+                            help='Seconds between the first probes, '
+                                 'doubled after every failed probe.')
+        parser.add_argument('--max-interval', type=float, default=1,
+                            help='Maximum seconds between probes.')
 
     def handle(self, *args, **options):
         self.stdout.write('waiting for DB to start...')
-        db_up = False
-        while db_up is False:
+        connection = connections[options['database']]
+        started = time.monotonic()
+        deadline = started + options['timeout']
+        interval = options['interval']
+        while True:
             try:
-                self.check(databases=['default'])
-                db_up = True
+                connection.ensure_connection()
+                break
             except (Psycorpg2OpError, OperationalError):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        f'DB unavailable after {options["timeout"]} seconds')
+                interval = min(interval, remaining)
                 self.stdout.write(self.style.WARNING(
-                    'DB unavailable, waiting 1 second...'))
-                time.sleep(1)
+                    f'DB unavailable, waiting {interval:.2f} seconds...'))
+                time.sleep(interval)
+                interval = min(interval * 2, options['max_interval'])
 
-        self.stdout.write(self.style.SUCCESS('DB available!'))
+        self.stdout.write(self.style.SUCCESS(
+            f'DB available after {time.monotonic() - started:.2f} seconds!'))
@@ -0,0 +1,302 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Every process keeps its own values. When ``METRICS_DIR`` is set, each
+process also writes them to ``<pid>.json`` there every
+``METRICS_FLUSH_INTERVAL`` seconds, and a scrape merges the files of all
+workers. The files of exited workers are folded into ``archive.json``, so
+counters and histograms keep their totals.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+
+ARCHIVE_FILE = 'archive.json'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Registry:
+    """Metrics of this process and the files of the other workers."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._checked_pid = None
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+
+    def collect(self):
+        """Return the families of this process.
+
+        A family is a dict with the type, help text and samples, where a
+        sample is [name, labels, value].
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                'type': metric.type,
+                'help': metric.documentation,
+                'samples': [[name, list(map(list, labels)), value]
+                            for name, labels, value in metric.samples()],
+            }
+            for metric in metrics
+        }
+
+    def check_process(self):
+        """Forget values inherited over fork and start the file flusher.
+
+        Called on every request, so the common case is one comparison.
+        """
+        pid = os.getpid()
+        if self._checked_pid == pid:
+            return
+        with self._lock:
+            if self._checked_pid == pid:
+                return
+            forked = self._pid != pid
+            self._pid = self._checked_pid = pid
+            metrics = list(self._metrics.values())
+        if forked:
+            for metric in metrics:
+                metric.reset()
+        if settings.METRICS_DIR:
+            threading.Thread(target=self._flush_forever, name='metrics',
+                             daemon=True).start()
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        """Write the values of this process to its file."""
+        write_families(os.path.join(settings.METRICS_DIR,
+                                    f'{os.getpid()}.json'), self.collect())
+
+    def exposition(self):
+        """Return the metrics of all processes in text format."""
+        families = self.collect()
+        if settings.METRICS_DIR:
+            own = f'{os.getpid()}.json'
+            for filename in sorted(os.listdir(settings.METRICS_DIR)):
+                if filename.endswith('.json') and filename != own:
+                    merge_families(families, read_families(
+                        os.path.join(settings.METRICS_DIR, filename)))
+        return render_families(families)
+
+
+registry = Registry()
+
+
+class Metric:
+    """Metric with values per combination of label values."""
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(),
+                 registry=registry):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def labels(self, labelvalues):
+        return tuple(zip(self.labelnames, map(str, labelvalues)))
+
+    def samples(self):
+        """Return (sample name, labels, value) of every value."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = (
+                self._values.get(labelvalues, 0) + amount)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [(f'{self.name}_total', self.labels(labelvalues), value)
+                for labelvalues, value in values]
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS, registry=registry):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labelvalues)
+            if counts is None:
+                # One count per bucket, then +Inf, then the sum.
+                counts = self._values[labelvalues] = (
+                    [0] * (len(self.buckets) + 1) + [0.0])
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self):
+        with self._lock:
+            values = [(labelvalues, list(counts))
+                      for labelvalues, counts in self._values.items()]
+        samples = []
+        for labelvalues, counts in values:
+            labels = self.labels(labelvalues)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = '+Inf' if bound == math.inf else repr(float(bound))
+                samples.append(
+                    (f'{self.name}_bucket', labels + (('le', le),),
+                     cumulative))
+            samples.append((f'{self.name}_sum', labels, counts[-1]))
+            samples.append((f'{self.name}_count', labels, cumulative))
+        return samples
+
+
+class Callback(Metric):
+    """Metric whose values are read from function when collected.
+
+    function returns a dict of label values tuple to value.
+    """
+
+    def __init__(self, name, documentation, labelnames, function,
+                 kind='gauge', registry=registry):
+        self.type = kind
+        self.function = function
+        super().__init__(name, documentation, labelnames, registry)
+
+    def samples(self):
+        suffix = '_total' if self.type == 'counter' else ''
+        return [(f'{self.name}{suffix}', self.labels(labelvalues), value)
+                for labelvalues, value in self.function().items()]
+
+
+def read_families(path):
+    """Return the families stored at path, or none if it is gone."""
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_families(path, families):
+    """Store families at path atomically."""
+    temporary = f'{path}.{threading.get_ident()}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(families, file)
+    os.replace(temporary, path)
+
+
+def merge_families(families, other):
+    """Add the samples of other to families."""
+    for name, family in other.items():
+        merged = families.setdefault(
+            name, {'type': family['type'], 'help': family['help'],
+                   'samples': []})
+        index = {(sample[0], json.dumps(sample[1])): sample
+                 for sample in merged['samples']}
+        for sample_name, labels, value in family['samples']:
+            existing = index.get((sample_name, json.dumps(labels)))
+            if existing is None:
+                sample = [sample_name, labels, value]
+                merged['samples'].append(sample)
+                index[(sample_name, json.dumps(labels))] = sample
+            else:
+                existing[2] += value
+    return families
+
+
+def archive_process(directory, pid):
+    """Fold the file of exited process pid into the archive.
+
+    Gauges describe live processes only and are dropped.
+    """
+    path = os.path.join(directory, f'{pid}.json')
+    families = read_families(path)
+    if families:
+        families = {name: family for name, family in families.items()
+                    if family['type'] != 'gauge'}
+        archive_path = os.path.join(directory, ARCHIVE_FILE)
+        write_families(archive_path, merge_families(
+            read_families(archive_path), families))
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def clear_directory(directory):
+    """Remove the files left by earlier runs."""
+    for filename in os.listdir(directory):
+        if filename.endswith('.json'):
+            os.remove(os.path.join(directory, filename))
+
+
+def format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def render_families(families):
+    """Return families in the Prometheus text exposition format."""
+    lines = []
+    for name in sorted(families):
+        family = families[name]
+        lines.append(f'# HELP {name} {family["help"]}')
+        lines.append(f'# TYPE {name} {family["type"]}')
+        for sample_name, labels, value in family['samples']:
+            if labels:
+                label_text = ','.join(
+                    f'{label}="{escape(label_value)}"'
+                    for label, label_value in labels)
+                sample_name = f'{sample_name}{{{label_text}}}'
+            lines.append(f'{sample_name} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return (value.replace('\\', '\\\\').replace('\n', '\\n')
+            .replace('"', '\\"'))
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Time spent handling requests by route.',
+    ['route', 'method'],
+)
+DB_QUERIES = Counter(
+    'db_queries',
+    'Database queries executed.',
+    ['alias'],
+)
+DB_QUERY_SECONDS = Counter(
+    'db_query_seconds',
+    'Time spent executing database queries.',
+    ['alias'],
+)
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_provisioningjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantReading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField()),
+                ('soil_moisture_percentage', models.FloatField(blank=True, null=True)),
+                ('fertilizer_per_meter', models.FloatField(blank=True, null=True)),
+                ('height', models.FloatField(blank=True, null=True)),
+                ('number_or_stems', models.FloatField(blank=True, null=True)),
+                ('health', models.FloatField(blank=True, null=True)),
+                ('soil_cohesity', models.FloatField(blank=True, null=True)),
+                ('disease', models.FloatField(blank=True, null=True)),
+                ('insects_per_meter', models.FloatField(blank=True, null=True)),
+                ('plant', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='readings', to='core.plant')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='plantreading',
+            index=models.Index(fields=['plant', '-recorded_at'], name='plantreading_plant_time_idx'),
+        ),
+    ]
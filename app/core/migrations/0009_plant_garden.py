@@ -0,0 +1,53 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # The string garden_id column is left as it is, instances of the old
+    # release keep reading and writing it during a rolling deploy. The
+    # foreign key gets its own column, garden_ref_id.
+
+    dependencies = [
+        ('core', '0008_plantreading'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='garden',
+            name='plants',
+            field=models.ManyToManyField(related_name='gardens', to='core.Plant'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameField(
+                    model_name='plant',
+                    old_name='garden_id',
+                    new_name='legacy_garden_id',
+                ),
+                migrations.AlterField(
+                    model_name='plant',
+                    name='legacy_garden_id',
+                    field=models.CharField(blank=True, db_column='garden_id', max_length=255),
+                ),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='plant',
+                    name='garden',
+                    field=models.ForeignKey(blank=True, db_column='garden_ref_id', null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.garden'),
+                ),
+            ],
+            database_operations=[
+                # Indexed concurrently by 0010_plant_garden_index.
+                migrations.AddField(
+                    model_name='plant',
+                    name='garden',
+                    field=models.ForeignKey(blank=True, db_column='garden_ref_id', db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.garden'),
+                ),
+            ],
+        ),
+    ]
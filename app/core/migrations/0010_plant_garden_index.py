@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:55
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0009_plant_garden'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS '
+            'core_plant_garden_ref_id_idx ON core_plant (garden_ref_id);',
+            'DROP INDEX CONCURRENTLY IF EXISTS core_plant_garden_ref_id_idx;',
+        ),
+    ]
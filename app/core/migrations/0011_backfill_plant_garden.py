@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-17 17:56
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 10000
+
+
+def backfill_plant_garden(apps, schema_editor):
+    """Set Plant.garden from the legacy string column in id batches.
+
+    Every batch commits on its own, so only the rows of one batch are
+    locked at a time.
+    """
+    Plant = apps.get_model('core', 'Plant')
+    Garden = apps.get_model('core', 'Garden')
+    garden_column = Plant._meta.get_field('garden').column
+    legacy_column = Plant._meta.get_field('legacy_garden_id').column
+    connection = schema_editor.connection
+    last_id = Plant.objects.order_by('-id').values_list(
+        'id', flat=True).first() or 0
+    for start in range(0, last_id + 1, BATCH_SIZE):
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {Plant._meta.db_table} AS plant '
+                    f'SET {garden_column} = garden.id '
+                    f'FROM {Garden._meta.db_table} AS garden '
+                    f'WHERE plant.id >= %s AND plant.id < %s '
+                    f'AND plant.{garden_column} IS NULL '
+                    f"AND plant.{legacy_column} ~ '^[0-9]{{1,18}}$' "
+                    f'AND garden.id = plant.{legacy_column}::bigint',
+                    [start, start + BATCH_SIZE],
+                )
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('core', '0010_plant_garden_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_plant_garden,
+                             migrations.RunPython.noop),
+    ]
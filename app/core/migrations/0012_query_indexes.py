@@ -0,0 +1,88 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+CREATE_TRIGRAM_INDEX = (
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS garden_name_trgm_idx '
+    'ON core_garden USING gin (UPPER(name::text) gin_trgm_ops)'
+)
+
+
+def rename_duplicate_names(apps, schema_editor):
+    """Rename contracts sharing a name of their user ignoring case.
+
+    All but the first contract of each name get ' (n)' appended, counting
+    up from their rank until the name is free among those of the user.
+    """
+    Contract = apps.get_model('core', 'Contract')
+    duplicates = Contract.objects.annotate(lower_name=Lower('name')).values(
+        'user_id', 'lower_name').annotate(count=Count('id')).filter(
+        count__gt=1)
+    user_ids = {duplicate['user_id'] for duplicate in duplicates}
+    for user_id in user_ids:
+        contracts = Contract.objects.filter(user_id=user_id).order_by('id')
+        taken = {contract.name.lower() for contract in contracts}
+        seen = set()
+        for contract in contracts:
+            lower_name = contract.name.lower()
+            if lower_name not in seen:
+                seen.add(lower_name)
+                continue
+            rank = 2
+            while True:
+                name = f'{contract.name[:240]} ({rank})'
+                if name.lower() not in taken:
+                    break
+                rank += 1
+            taken.add(name.lower())
+            contract.name = name
+            contract.save(update_fields=['name'])
+
+
+def create_trigram_index(apps, schema_editor):
+    """Index garden names for icontains search if pg_trgm is available."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        cursor.execute(CREATE_TRIGRAM_INDEX)
+
+
+def drop_trigram_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP INDEX CONCURRENTLY IF EXISTS garden_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently, which cannot run in a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_backfill_plant_garden'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='contract',
+            index=models.Index(fields=['user', '-id'], name='contract_user_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='garden',
+            index=models.Index(fields=['user', '-name'], name='garden_user_name_idx'),
+        ),
+        # Rename case-insensitive duplicates so the unique index can build.
+        migrations.RunPython(rename_duplicate_names,
+                             migrations.RunPython.noop, atomic=True),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS '
+            'contract_user_lower_name_uniq '
+            'ON core_contract (user_id, LOWER(name))',
+            'DROP INDEX CONCURRENTLY IF EXISTS contract_user_lower_name_uniq',
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
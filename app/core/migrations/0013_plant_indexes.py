@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-17 21:40
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently, which cannot run in a transaction.
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0012_query_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='plant',
+            index=models.Index(fields=['user', '-id'], name='plant_user_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='plant',
+            index=models.Index(condition=models.Q(('has_plant', False)), fields=['user', '-id'], name='plant_user_empty_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='plant',
+            index=models.Index(fields=['user', 'health'], name='plant_user_health_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='plant',
+            index=models.Index(fields=['user', 'disease'], name='plant_user_disease_idx'),
+        ),
+        # Drop the plain user index only once its replacements exist.
+        migrations.AlterField(
+            model_name='plant',
+            name='user',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -61,6 +61,18 @@ class Contract(models.Model):
         MaxValueValidator(3),
     ])
     gardens = models.ManyToManyField('Garden')
+    # Advanced with updated_at whenever the contract or its tree changes.
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Names are also unique per user case-insensitively, enforced by
+        # the contract_user_lower_name_uniq expression index (migration
+        # 0012) which Django 3.2 cannot declare here.
+        indexes = [
+            models.Index(fields=['user', '-id'],
+                         name='contract_user_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -75,17 +87,53 @@ class Garden(models.Model):
         MinValueValidator(1),
         MaxValueValidator(3),
         ])
-    plants = models.ManyToManyField('Plant')
+    plants = models.ManyToManyField('Plant', related_name='gardens')
+    # Advanced with updated_at whenever the garden or its plants change.
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Name search is served by the garden_name_trgm_idx trigram index
+        # (migration 0012) when pg_trgm is available.
+        indexes = [
+            models.Index(fields=['user', '-name'],
+                         name='garden_user_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+# Metric fields of a plant, updated in bulk and by telemetry.
+PLANT_METRIC_FIELDS = (
+    'soil_moisture_percentage',
+    'fertilizer_per_meter',
+    'height',
+    'number_or_stems',
+    'health',
+    'has_plant',
+    'soil_cohesity',
+    'disease',
+    'insects_per_meter',
+)
+# The measured ones, which readings record and stats and filters range over.
+PLANT_MEASURED_FIELDS = tuple(
+    field for field in PLANT_METRIC_FIELDS if field != 'has_plant')
+
+
 class Plant(models.Model):
-    garden_id = models.CharField(max_length=255)
+    # The garden_id column keeps the legacy string id, read by instances of
+    # the previous release, until a later migration drops it.
+    garden = models.ForeignKey(Garden, on_delete=models.SET_NULL,
+                               null=True, blank=True,
+                               db_column='garden_ref_id')
+    legacy_garden_id = models.CharField(max_length=255, blank=True,
+                                        db_column='garden_id')
     name = models.CharField(max_length=255)
+    # Served by the composite indexes below, which all start with user.
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
-                             on_delete=models.CASCADE, null=True)
+                             on_delete=models.CASCADE, null=True,
+                             db_index=False)
     soil_moisture_percentage = models.FloatField(default=0)
     fertilizer_per_meter = models.FloatField(default=0)
     height = models.FloatField(default=0)
@@ -95,6 +143,91 @@ class Plant(models.Model):
     soil_cohesity = models.FloatField(default=0)
     disease = models.FloatField(default=0)
     insects_per_meter = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Only the metrics filtered most are indexed, every metric index
+        # makes telemetry and bulk updates of the others non-HOT.
+        indexes = [
+            models.Index(fields=['user', '-id'], name='plant_user_id_idx'),
+            models.Index(fields=['user', '-id'], name='plant_user_empty_idx',
+                         condition=models.Q(has_plant=False)),
+            models.Index(fields=['user', 'health'],
+                         name='plant_user_health_idx'),
+            models.Index(fields=['user', 'disease'],
+                         name='plant_user_disease_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored garden, which a save may change."""
+        instance = super().from_db(db, field_names, values)
+        if 'garden_id' in instance.__dict__:
+            instance._stored_garden_id = instance.garden_id
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Keep the legacy garden id column in sync while it is read."""
+        if settings.PLANT_GARDEN_ID_COMPAT:
+            self.legacy_garden_id = legacy_garden_id(self.garden_id)
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return self.name
+
+
+def legacy_garden_id(garden_id):
+    """Return garden id in the format of the legacy string column."""
+    return '' if garden_id is None else str(garden_id)
+
+
+class ProvisioningJob(models.Model):
+    """Background job provisioning the gardens and plants of a contract."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        RUNNING = 'running'
+        DONE = 'done'
+        FAILED = 'failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4,
+                          unique=True, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE)
+    # Cleared when the contract of a failed job is deleted.
+    contract = models.ForeignKey(Contract, on_delete=models.SET_NULL,
+                                 null=True,
+                                 related_name='provisioning_jobs')
+    status = models.CharField(max_length=16, choices=Status.choices,
+                              default=Status.PENDING)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.contract} ({self.status})'
+
+
+class PlantReading(models.Model):
+    """Sensor reading of a plant at a point in time."""
+    plant = models.ForeignKey(Plant, on_delete=models.CASCADE,
+                              related_name='readings', db_index=False)
+    recorded_at = models.DateTimeField()
+    soil_moisture_percentage = models.FloatField(null=True, blank=True)
+    fertilizer_per_meter = models.FloatField(null=True, blank=True)
+    height = models.FloatField(null=True, blank=True)
+    number_or_stems = models.FloatField(null=True, blank=True)
+    health = models.FloatField(null=True, blank=True)
+    soil_cohesity = models.FloatField(null=True, blank=True)
+    disease = models.FloatField(null=True, blank=True)
+    insects_per_meter = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['plant', '-recorded_at'],
+                         name='plantreading_plant_time_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.plant_id} at {self.recorded_at}'
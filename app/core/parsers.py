@@ -0,0 +1,53 @@
+"""
+JSON parser backed by orjson when it is installed.
+"""
+import io
+
+from django.conf import settings
+
+from rest_framework import parsers
+
+from core.renderers import (
+    FastJSONRenderer,
+    orjson,
+)
+
+UTF8 = {'utf-8', 'utf8'}
+# orjson parses integers over 64 bits as floats. Digits map to 0, dots stay
+# and every other byte becomes a space, so such an integer, a token of 19
+# or more digits, shows up as a space and 19 zeros.
+NUMBER_SHAPES = bytes(
+    ord('0') if ord('0') <= byte <= ord('9') else
+    byte if byte == ord('.') else ord(' ')
+    for byte in range(256))
+WIDE_INTEGER = b' ' + b'0' * 19
+
+
+def has_wide_integer(content):
+    """Return whether content may hold an integer orjson cannot parse."""
+    return WIDE_INTEGER in (b' ' + content).translate(NUMBER_SHAPES)
+
+
+class FastJSONParser(parsers.JSONParser):
+    """JSONParser parsing UTF-8 bodies with orjson.
+
+    Bodies orjson rejects, like invalid JSON or non strict constants, and
+    bodies with integers over 64 bits are parsed by JSONParser, so results
+    and errors are the same as before.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get(
+            'encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in UTF8:
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        if has_wide_integer(content):
+            return super().parse(io.BytesIO(content), media_type,
+                                 parser_context)
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(content), media_type,
+                                 parser_context)
@@ -0,0 +1,68 @@
+"""
+JSON renderer backed by orjson when it is installed.
+"""
+import re
+
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson writes floats below 1e-4 as 0.0000... or with an exponent and
+# floats from 1e16 as 1e16, where the json module writes 1e-05 and 1e+16.
+# Outputs that may hold such floats are rendered again with json. Number
+# tokens end with one of `,}]`, which tells them from UUIDs and names.
+SMALL_FLOAT = b'0.0000'
+EXPONENT = re.compile(rb'e-?[0-9]+[,}\]]')
+# U+2028 and U+2029 are escaped like JSONRenderer does, both start with
+# these bytes in UTF-8.
+LINE_SEPARATOR_PREFIX = b'\xe2\x80'
+
+
+def has_small_float(content):
+    """Return whether content may hold a float orjson wrote as 0.0000..."""
+    index = content.find(SMALL_FLOAT)
+    while index != -1:
+        if index == 0 or not content[index - 1:index].isdigit():
+            return True
+        index = content.find(SMALL_FLOAT, index + 1)
+    return False
+
+
+def same_as_json(content):
+    """Return whether the json module would have rendered content."""
+    return not has_small_float(content) and EXPONENT.search(content) is None
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer producing the same bytes faster with orjson.
+
+    Indented, non compact or ASCII output, payloads orjson cannot encode
+    and payloads with floats it formats differently go through
+    JSONRenderer. Unlike JSONRenderer, NaN and infinity render as null
+    rather than failing.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or
+                not self.compact or self.get_indent(
+                    accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        try:
+            content = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        if not same_as_json(content):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        if LINE_SEPARATOR_PREFIX in content:
+            content = content.replace(
+                b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029')
+        return content
@@ -0,0 +1,35 @@
+"""
+Signal handlers of the core app.
+"""
+import time
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from core.metrics import (
+    DB_QUERIES,
+    DB_QUERY_SECONDS,
+)
+
+
+class QueryCounter:
+    """Execute wrapper counting the queries of one connection."""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            DB_QUERIES.inc(self.alias)
+            DB_QUERY_SECONDS.inc(self.alias,
+                                 amount=time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def count_queries(sender, connection, **kwargs):
+    if not any(isinstance(wrapper, QueryCounter)
+               for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(QueryCounter(connection.alias))
@@ -0,0 +1,129 @@
+"""
+Tests for the ASGI handler.
+"""
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+
+from django.contrib.auth import get_user_model
+from django.core.signals import (
+    request_finished,
+    request_started,
+)
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from core.asgi import ASGIHandler
+from core.models import Plant
+
+
+def http_scope(path, query_string=b'', token=None):
+    """Create and return ASGI scope of a GET request."""
+    headers = [(b'host', b'testserver')]
+    if token:
+        headers.append((b'authorization', f'Token {token}'.encode()))
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string,
+        'root_path': '',
+        'headers': headers,
+        'client': ('127.0.0.1', 1234),
+        'server': ('testserver', 80),
+    }
+
+
+class ASGIHandlerTests(TransactionTestCase):
+    """Test serving requests through the ASGI handler."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123')
+        self.token = Token.objects.create(user=self.user)
+
+    async def get(self, path, query_string=b'', handler=None):
+        """Run GET request and return its start and body messages."""
+        communicator = ApplicationCommunicator(
+            handler or ASGIHandler(),
+            http_scope(path, query_string, self.token.key),
+        )
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(timeout=5)
+        bodies = []
+        while True:
+            message = await communicator.receive_output(timeout=5)
+            bodies.append(message)
+            if not message.get('more_body'):
+                break
+        await communicator.wait()
+        return start, bodies
+
+    async def test_stream_plants(self):
+        """Test streamed listings query the database off the event loop."""
+        plants = await sync_to_async(Plant.objects.bulk_create)([
+            Plant(user=self.user, name=f'plant {i}') for i in range(3)
+        ])
+
+        start, bodies = await self.get(
+            reverse('contract:plant-list'), b'stream=true')
+
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'Content-Type', b'application/json'),
+                      start['headers'])
+        self.assertGreater(len(bodies), 1)
+        content = json.loads(b''.join(
+            body.get('body', b'') for body in bodies))
+        self.assertEqual([plant['id'] for plant in content['result']],
+                         [plant.id for plant in reversed(plants)])
+
+    async def test_requests_run_on_own_threads(self):
+        """Test requests are not pinned to one shared thread."""
+        threads = set()
+
+        def record_thread(**kwargs):
+            threads.add(threading.current_thread().name)
+
+        request_started.connect(record_thread)
+        try:
+            for _ in range(2):
+                start, _ = await self.get(reverse('user:me'))
+                self.assertEqual(start['status'], 200)
+        finally:
+            request_started.disconnect(record_thread)
+
+        self.assertEqual(len(threads), 2)
+
+    async def test_requests_bounded(self):
+        """Test no more than max_threads requests are served at once."""
+        handler = ASGIHandler(max_threads=1)
+        active = []
+        served = []
+
+        def started(**kwargs):
+            active.append(threading.current_thread())
+            served.append(len(active))
+
+        def finished(**kwargs):
+            active.pop()
+
+        request_started.connect(started)
+        request_finished.connect(finished)
+        try:
+            await asyncio.gather(*[
+                self.get(reverse('user:me'), handler=handler)
+                for _ in range(3)])
+        finally:
+            request_started.disconnect(started)
+            request_finished.disconnect(finished)
+
+        self.assertEqual(served, [1, 1, 1])
@@ -0,0 +1,46 @@
+"""
+Tests for in-process caches.
+"""
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.cache import LRUCacheBackend
+
+
+class LRUCacheBackendTests(SimpleTestCase):
+    """Test the in-process LRU backend."""
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted when full."""
+        backend = LRUCacheBackend(timeout=60, max_entries=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        backend.get('a')
+        backend.set('c', 3)
+
+        self.assertEqual(backend.get('a'), 1)
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.get('c'), 3)
+
+    @patch('core.cache.time.monotonic')
+    def test_expires_entries(self, patched_monotonic):
+        """Test entries are dropped once their timeout passed."""
+        backend = LRUCacheBackend(timeout=10, max_entries=2)
+        patched_monotonic.return_value = 100
+        backend.set('a', 1)
+
+        patched_monotonic.return_value = 105
+        self.assertEqual(backend.get('a'), 1)
+        patched_monotonic.return_value = 111
+        self.assertIsNone(backend.get('a'))
+
+    def test_values_detached(self):
+        """Test mutating values set or returned does not change the cache."""
+        backend = LRUCacheBackend(timeout=60, max_entries=2)
+        value = {'gardens': []}
+        backend.set('a', value)
+        value['gardens'].append(1)
+        backend.get('a')['gardens'].append(2)
+
+        self.assertEqual(backend.get('a'), {'gardens': []})
@@ -1,33 +1,164 @@
 """
 Test custom Django managment commands.
 """
-
+import json
+import os
+import socketserver
+import tempfile
+import threading
+from io import StringIO
 from unittest.mock import patch
 from psycopg2 import OperationalError as Psycopg2Error
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
 
 
-@patch('core.management.commands.wait_for_db.Command.check')
+@patch.object(connection, 'ensure_connection')
 class CommandTests(SimpleTestCase):
 
-    def test_wait_for_db_ready(self, patched_check):
+    def test_wait_for_db_ready(self, patched_connect):
         """Test checking if db is ready."""
-        patched_check.return_value = True
-
-        call_command('wait_for_db')
+        call_command('wait_for_db', stdout=StringIO())
 
-        patched_check.assert_called_once_with(databases=['default'])
+        patched_connect.assert_called_once_with()
 
     @patch('time.sleep')
-    def test_wait_for_db_delay(self, patched_sleep, patched_check):
+    def test_wait_for_db_delay(self, patched_sleep, patched_connect):
         """Test waiting for db when getting operstionalerror."""
 
-        patched_check.side_effect = [Psycopg2Error] * 2 + \
-            [OperationalError] * 3 + [True]
+        patched_connect.side_effect = [Psycopg2Error] * 2 + \
+            [OperationalError] * 3 + [None]
+
+        call_command('wait_for_db', stdout=StringIO())
+
+        self.assertEqual(patched_connect.call_count, 6)
+        self.assertEqual(
+            [call.args[0] for call in patched_sleep.call_args_list],
+            [0.05, 0.1, 0.2, 0.4, 0.8])
+
+    @patch('time.sleep')
+    def test_wait_for_db_max_interval(self, patched_sleep, patched_connect):
+        """Test the delay between probes stops growing at max interval."""
+        patched_connect.side_effect = [OperationalError] * 4 + [None]
+
+        call_command('wait_for_db', interval=0.5, max_interval=1,
+                     stdout=StringIO())
+
+        self.assertEqual(
+            [call.args[0] for call in patched_sleep.call_args_list],
+            [0.5, 1, 1, 1])
+
+    @patch('time.sleep')
+    def test_wait_for_db_timeout(self, patched_sleep, patched_connect):
+        """Test giving up once the timeout has passed."""
+        patched_connect.side_effect = OperationalError
+
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', timeout=0, stdout=StringIO())
+
+        patched_sleep.assert_not_called()
+
+
+class StartupCommandTests(TestCase):
+
+    @patch('core.management.commands.startup.call_command')
+    def test_startup_skips_applied_migrations(self, patched_call):
+        """Test migrate is not run when every migration is applied."""
+        out = StringIO()
+
+        call_command('startup', stdout=out)
+
+        commands = [call.args[0] for call in patched_call.call_args_list]
+        self.assertEqual(commands, ['wait_for_db'])
+        self.assertIn('skipping migrate', out.getvalue())
+        self.assertIn('startup:', out.getvalue())
+
+    @patch('django.db.migrations.executor.MigrationExecutor.migration_plan')
+    @patch('core.management.commands.startup.call_command')
+    def test_startup_runs_migrate(self, patched_call, patched_plan):
+        """Test migrate is run when migrations are not applied."""
+        patched_plan.return_value = [('migration', False)]
+        out = StringIO()
+
+        call_command('startup', stdout=out)
+
+        commands = [call.args[0] for call in patched_call.call_args_list]
+        self.assertEqual(commands, ['wait_for_db', 'migrate'])
+        self.assertIn('migrate:', out.getvalue())
+
+
+class BenchmarkCommandTests(TestCase):
+
+    def test_benchmark_api(self):
+        """Test benchmarking writes results and removes its data."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+
+            call_command('benchmark_api', users=1, contracts_per_level=1,
+                         iterations=2, output=output, stdout=StringIO())
+
+            with open(output) as file:
+                report = json.load(file)
+
+        results = report['results']
+        self.assertEqual(results['contract-create']['requests'], 3)
+        for name in ('contract-list', 'contract-detail', 'plant-list',
+                     'garden-search', 'token-auth'):
+            self.assertIn('p99_ms', results[name])
+            self.assertIn('queries_per_request', results[name])
+            self.assertIn('peak_memory_kb', results[name])
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_benchmark_serializers(self):
+        """Test comparing serializers checks outputs and removes its data."""
+        out = StringIO()
+
+        call_command('benchmark_serializers', level=1, repeat=1, stdout=out)
+
+        self.assertIn('plant rows', out.getvalue())
+        self.assertIn('contract tree', out.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_benchmark_json(self):
+        """Test comparing JSON classes checks results and removes its data."""
+        out = StringIO()
+
+        call_command('benchmark_json', contracts=1, level=1, plants=10,
+                     repeat=1, stdout=out)
+
+        self.assertIn('render trees', out.getvalue())
+        self.assertIn('parse bulk', out.getvalue())
+        self.assertFalse(get_user_model().objects.exists())
+
+
+class ClosingHandler(socketserver.StreamRequestHandler):
+    """Read a request and close the connection without a response."""
+
+    def handle(self):
+        while self.rfile.readline() not in (b'\r\n', b''):
+            pass
+
+
+class LoadtestCommandTests(SimpleTestCase):
 
-        call_command('wait_for_db')
+    def test_loadtest_counts_empty_responses(self):
+        """Test responses without a status line are counted as errors."""
+        with socketserver.ThreadingTCPServer(('127.0.0.1', 0),
+                                             ClosingHandler) as server:
+            threading.Thread(target=server.serve_forever,
+                             daemon=True).start()
+            out = StringIO()
+            call_command('loadtest',
+                         f'http://127.0.0.1:{server.server_address[1]}/',
+                         '--requests', '3', '--concurrency', '1',
+                         stdout=out)
+            server.shutdown()
 
-        self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=['default'])
+        self.assertIn("statuses: {'error': 3}", out.getvalue())
@@ -0,0 +1,145 @@
+"""
+Tests for the database backend and connection pool.
+"""
+import threading
+
+from psycopg2.extensions import (
+    TRANSACTION_STATUS_IDLE,
+    TRANSACTION_STATUS_INTRANS,
+)
+
+from django.db import connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+
+from core.db.pool import (
+    ConnectionPool,
+    PoolTimeout,
+)
+
+
+class FakeConnection:
+    """Stand-in for a psycopg2 connection."""
+
+    def __init__(self):
+        self.closed = 0
+        self.rolled_back = False
+        self.info = type('Info', (), {
+            'transaction_status': TRANSACTION_STATUS_IDLE})()
+
+    def rollback(self):
+        self.rolled_back = True
+        self.info.transaction_status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test the connection pool."""
+
+    def test_reuses_returned_connection(self):
+        """Test a returned connection is checked out again."""
+        pool = ConnectionPool(max_size=2, timeout=1)
+        first = pool.getconn(FakeConnection)
+        pool.putconn(first)
+
+        self.assertIs(pool.getconn(FakeConnection), first)
+        self.assertEqual(pool.stats()['size'], 1)
+        self.assertEqual(pool.stats()['checked_out'], 1)
+
+    def test_rolls_back_open_transaction(self):
+        """Test a connection left in a transaction is rolled back."""
+        pool = ConnectionPool(max_size=1, timeout=1)
+        conn = pool.getconn(FakeConnection)
+        conn.info.transaction_status = TRANSACTION_STATUS_INTRANS
+
+        pool.putconn(conn)
+
+        self.assertTrue(conn.rolled_back)
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_discards_closed_connection(self):
+        """Test a closed connection is not reused."""
+        pool = ConnectionPool(max_size=1, timeout=1)
+        conn = pool.getconn(FakeConnection)
+        conn.close()
+
+        pool.putconn(conn)
+
+        self.assertIsNot(pool.getconn(FakeConnection), conn)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_waits_for_returned_connection(self):
+        """Test a full pool hands over the next returned connection."""
+        pool = ConnectionPool(max_size=1, timeout=5)
+        conn = pool.getconn(FakeConnection)
+        timer = threading.Timer(0.05, pool.putconn, [conn])
+        timer.start()
+
+        self.assertIs(pool.getconn(FakeConnection), conn)
+        timer.join()
+        stats = pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertGreater(stats['wait_time'], 0)
+
+    def test_timeout_when_full(self):
+        """Test checking out from a full pool times out."""
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.getconn(FakeConnection)
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(FakeConnection)
+
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_failed_connect_frees_slot(self):
+        """Test a connection that cannot be opened frees its slot."""
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+
+        def refuse():
+            raise OSError('connection refused')
+
+        with self.assertRaises(OSError):
+            pool.getconn(refuse)
+
+        self.assertEqual(pool.stats()['size'], 0)
+        self.assertIsNotNone(pool.getconn(FakeConnection))
+
+
+class BackendTests(TestCase):
+    """Test the database backend."""
+
+    def test_health_check_replaces_broken_connection(self):
+        """Test a persistent connection killed by the server is replaced."""
+        db = connection.copy()
+        db.health_check_enabled = True
+        db.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)',
+                           [db.connection.get_backend_pid()])
+
+        db.close_if_unusable_or_obsolete()
+        with db.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+        db.close()
+
+    def test_pooled_connection_returned_on_close(self):
+        """Test closing a pooled connection returns it to the pool."""
+        db = connection.copy()
+        db.settings_dict['POOL'] = {'MAX_SIZE': 1, 'TIMEOUT': 1}
+        pool = db.pool
+        db.ensure_connection()
+        conn = db.connection
+
+        db.close()
+        self.assertEqual(pool.stats()['idle'], 1)
+        db.ensure_connection()
+
+        self.assertIs(db.connection, conn)
+        db.close()
+        pool.closeall()
+        self.assertEqual(pool.stats()['size'], 0)
@@ -0,0 +1,99 @@
+"""
+Tests for the gunicorn config.
+"""
+import importlib
+import os
+import subprocess
+import sys
+import tempfile
+from unittest.mock import (
+    Mock,
+    patch,
+)
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from app import gunicorn
+
+
+class GunicornConfigTests(SimpleTestCase):
+    """Test the gunicorn config."""
+
+    def tearDown(self):
+        importlib.reload(gunicorn)
+
+    def test_workers_derived_from_cpu_count(self):
+        """Test the worker count defaults to twice the cores plus one."""
+        with patch('os.sched_getaffinity', return_value={0}):
+            importlib.reload(gunicorn)
+
+        self.assertEqual(gunicorn.workers, 3)
+        self.assertEqual(gunicorn.default_workers(4), 9)
+        self.assertEqual(gunicorn.worker_class, 'gthread')
+        self.assertTrue(gunicorn.preload_app)
+
+    def test_cpus_limited_by_cgroup_quota(self):
+        """Test a container CPU quota caps the cores of the affinity mask."""
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, 'cpu.max'), 'w') as file:
+                file.write('150000 100000\n')
+            limit = gunicorn.cgroup_cpu_limit(root)
+            with open(os.path.join(root, 'cpu.max'), 'w') as file:
+                file.write('max 100000\n')
+            unlimited = gunicorn.cgroup_cpu_limit(root)
+
+        self.assertEqual(limit, 2)
+        self.assertIsNone(unlimited)
+        with patch('os.sched_getaffinity', return_value=set(range(16))), \
+                patch.object(gunicorn, 'cgroup_cpu_limit', return_value=2):
+            self.assertEqual(gunicorn.available_cpus(), 2)
+
+    def test_cgroup_v1_quota(self):
+        """Test the quota is read from the cgroup v1 files."""
+        with tempfile.TemporaryDirectory() as root:
+            os.mkdir(os.path.join(root, 'cpu'))
+            for name, value in (('cpu.cfs_quota_us', '300000'),
+                                ('cpu.cfs_period_us', '100000')):
+                with open(os.path.join(root, 'cpu', name), 'w') as file:
+                    file.write(value)
+
+            self.assertEqual(gunicorn.cgroup_cpu_limit(root), 3)
+
+    def test_settings_from_environment(self):
+        """Test settings are overridden by environment variables."""
+        env = {'GUNICORN_WORKERS': '3', 'GUNICORN_THREADS': '8',
+               'GUNICORN_PRELOAD': 'false'}
+        with patch.dict(os.environ, env):
+            importlib.reload(gunicorn)
+
+        self.assertEqual(gunicorn.workers, 3)
+        self.assertEqual(gunicorn.threads, 8)
+        self.assertFalse(gunicorn.preload_app)
+
+    def test_workers_need_shared_cache(self):
+        """Test several workers do not start without a shared cache."""
+        server = Mock()
+        server.cfg.workers = 3
+        with patch.dict(os.environ, {'CACHE_LOCATION': ''}):
+            with self.assertRaises(RuntimeError):
+                gunicorn.on_starting(server)
+        with patch.dict(os.environ, {'CACHE_LOCATION': 'cache:11211'}):
+            gunicorn.on_starting(server)
+        server.cfg.workers = 1
+        with patch.dict(os.environ, {'CACHE_LOCATION': ''}):
+            gunicorn.on_starting(server)
+
+    def test_pre_fork_without_preload(self):
+        """Test forking works in a master that did not load Django."""
+        env = dict(os.environ)
+        env.pop('DJANGO_SETTINGS_MODULE', None)
+        script = ('from unittest.mock import Mock\n'
+                  'from app import gunicorn\n'
+                  'gunicorn.pre_fork(Mock(), Mock())\n')
+
+        result = subprocess.run([sys.executable, '-c', script], env=env,
+                                cwd=settings.BASE_DIR, capture_output=True,
+                                text=True)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
@@ -0,0 +1,105 @@
+"""
+Tests for the request instrumentation middleware.
+"""
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Plant
+
+PLANTS_URL = reverse('contract:plant-list')
+
+
+def instrumentation(**options):
+    """Return instrumentation settings overridden with options."""
+    defaults = {
+        'SAMPLE_RATE': 1.0,
+        'QUERY_BUDGET': 50,
+        'LATENCY_BUDGET_MS': 10000,
+    }
+    defaults.update(options)
+    return defaults
+
+
+class InstrumentationMiddlewareTests(TestCase):
+    """Test recording request timings."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123')
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        Plant.objects.create(user=self.user, name='plant')
+
+    def server_timing(self, response):
+        """Return the Server-Timing metrics of response by name."""
+        metrics = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=') for param in params)
+        return metrics
+
+    @override_settings(INSTRUMENTATION=instrumentation())
+    def test_server_timing(self):
+        """Test sampled requests report their timings."""
+        with self.assertLogs('core.instrumentation', 'INFO') as logs:
+            response = self.client.get(PLANTS_URL)
+
+        metrics = self.server_timing(response)
+        self.assertEqual(
+            set(metrics), {'total', 'sql', 'auth', 'serialize', 'render'})
+        self.assertRegex(metrics['sql']['desc'], r'"\d+ queries"')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], PLANTS_URL)
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+        self.assertNotIn('over_budget', record)
+
+    @override_settings(INSTRUMENTATION=instrumentation(),
+                       FAST_SERIALIZERS=False)
+    def test_serializer_timing(self):
+        """Test producing the data of DRF serializers is timed."""
+        with self.assertLogs('core.instrumentation', 'INFO'):
+            response = self.client.get(PLANTS_URL)
+
+        self.assertIn('serialize', self.server_timing(response))
+
+    @override_settings(INSTRUMENTATION=instrumentation(QUERY_BUDGET=0))
+    def test_query_budget(self):
+        """Test requests over the query budget are logged as warnings."""
+        with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+            self.client.get(PLANTS_URL)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['over_budget'], ['queries'])
+
+    @override_settings(INSTRUMENTATION=instrumentation(SAMPLE_RATE=0))
+    def test_not_sampled(self):
+        """Test requests that are not sampled are not instrumented."""
+        with patch('core.instrumentation.logger') as logger:
+            response = self.client.get(PLANTS_URL)
+
+        self.assertFalse(response.has_header('Server-Timing'))
+        logger.info.assert_not_called()
+        logger.warning.assert_not_called()
+
+    @override_settings(INSTRUMENTATION=instrumentation(
+        SAMPLE_RATE=0, LATENCY_BUDGET_MS=0))
+    def test_latency_budget_not_sampled(self):
+        """Test slow requests are logged even when not sampled."""
+        with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+            self.client.get(PLANTS_URL)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['over_budget'], ['latency'])
+        self.assertNotIn('queries', record)
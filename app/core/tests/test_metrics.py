@@ -0,0 +1,173 @@
+"""
+Tests for the metrics registry and endpoint.
+"""
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.metrics import (
+    Callback,
+    Counter,
+    Histogram,
+    Registry,
+    archive_process,
+    merge_families,
+    read_families,
+    render_families,
+    write_families,
+)
+
+METRICS_URL = reverse('metrics')
+
+
+class RegistryTests(SimpleTestCase):
+    """Test collecting and rendering metrics."""
+
+    def setUp(self):
+        self.registry = Registry()
+
+    def families(self, *metrics):
+        """Return the collected families of metrics."""
+        collected = self.registry.collect()
+        return {metric.name: collected[metric.name] for metric in metrics}
+
+    def test_counter(self):
+        """Test counters are rendered per label values."""
+        counter = Counter('test_counter', 'Test counter.', ['kind'],
+                          registry=self.registry)
+        counter.inc('a')
+        counter.inc('a', amount=2)
+        counter.inc('b')
+
+        text = render_families(self.families(counter))
+
+        self.assertIn('# TYPE test_counter counter', text)
+        self.assertIn('test_counter_total{kind="a"} 3', text)
+        self.assertIn('test_counter_total{kind="b"} 1', text)
+
+    def test_histogram(self):
+        """Test histogram buckets are cumulative."""
+        histogram = Histogram('test_histogram', 'Test histogram.',
+                              ['route'], buckets=[0.1, 1],
+                              registry=self.registry)
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value, 'list')
+
+        text = render_families(self.families(histogram))
+
+        self.assertIn('test_histogram_bucket{route="list",le="0.1"} 1', text)
+        self.assertIn('test_histogram_bucket{route="list",le="1.0"} 2', text)
+        self.assertIn('test_histogram_bucket{route="list",le="+Inf"} 3',
+                      text)
+        self.assertIn('test_histogram_count{route="list"} 3', text)
+        self.assertIn('test_histogram_sum{route="list"} 5.55', text)
+
+    def test_merge_workers(self):
+        """Test the files of other workers are added up."""
+        counter = Counter('test_merged', 'Test merged.',
+                          registry=self.registry)
+        counter.inc(amount=2)
+        other = self.families(counter)
+
+        with tempfile.TemporaryDirectory() as directory:
+            write_families(os.path.join(directory, '1.json'), other)
+            write_families(os.path.join(directory, '2.json'), other)
+            with override_settings(METRICS_DIR=directory):
+                text = self.registry.exposition()
+
+        self.assertIn('test_merged_total 6', text)
+
+    def test_archive_exited_worker(self):
+        """Test exited workers keep their counters but not their gauges."""
+        counter = Counter('test_archived', 'Test archived.',
+                          registry=self.registry)
+        counter.inc()
+        gauge = Callback('test_live', 'Test live.', [], lambda: {(): 1},
+                         registry=self.registry)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, '1.json')
+            write_families(path, self.families(counter, gauge))
+            archive_process(directory, 1)
+            write_families(path, self.families(counter, gauge))
+            archive_process(directory, 1)
+
+            archive = read_families(os.path.join(directory, 'archive.json'))
+            self.assertFalse(os.path.exists(path))
+
+        self.assertEqual(set(archive), {'test_archived'})
+        self.assertEqual(archive['test_archived']['samples'][0][2], 2)
+
+    def test_merge_new_labels(self):
+        """Test samples only known to another worker are added."""
+        merged = merge_families(
+            {'m': {'type': 'counter', 'help': '', 'samples': [
+                ['m_total', [['kind', 'a']], 1]]}},
+            {'m': {'type': 'counter', 'help': '', 'samples': [
+                ['m_total', [['kind', 'b']], 2]]}},
+        )
+
+        self.assertEqual(len(merged['m']['samples']), 2)
+
+    def test_checked_process_not_locked(self):
+        """Test checking the process again on a request takes no lock."""
+        with override_settings(METRICS_DIR=None):
+            self.registry.check_process()
+
+        with patch.object(self.registry, '_lock') as lock:
+            self.registry.check_process()
+
+        lock.__enter__.assert_not_called()
+
+
+class MetricsApiTests(TestCase):
+    """Test the metrics endpoint."""
+
+    def test_metrics(self):
+        """Test request, query, provisioning and cache metrics are listed."""
+        user = get_user_model().objects.create_user(
+            'user@example.com', 'testpass123')
+        client = APIClient()
+        client.force_authenticate(user)
+        client.post(reverse('contract:contract-list'),
+                    {'name': 'contract', 'level': 1}, format='json')
+        client.get(reverse('contract:contract-list'))
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        text = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{'
+                      'route="contract:contract-list",method="POST"}', text)
+        self.assertIn('db_queries_total{alias="default"}', text)
+        self.assertIn('contract_provisioning_seconds_count{level="1"}', text)
+        self.assertIn('contract_cache_requests_total{result="miss"}', text)
+        self.assertIn('token_cache_requests_total{result="hit"}', text)
+
+    def test_metrics_forbidden(self):
+        """Test other addresses need the metrics token."""
+        response = self.client.get(METRICS_URL, REMOTE_ADDR='192.0.2.1')
+
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """Test the metrics token is accepted from any address."""
+        wrong = self.client.get(METRICS_URL, REMOTE_ADDR='192.0.2.1',
+                                HTTP_AUTHORIZATION='Bearer wrong')
+        response = self.client.get(METRICS_URL, REMOTE_ADDR='192.0.2.1',
+                                   HTTP_AUTHORIZATION='Bearer secret')
+
+        self.assertEqual(wrong.status_code, 403)
+        self.assertEqual(response.status_code, 200)
@@ -1,7 +1,11 @@
 """
 Tests for models.
 """
-from django.test import TestCase
+from django.db import connection
+from django.test import (
+    TestCase,
+    override_settings,
+)
 from django.contrib.auth import get_user_model
 
 from core import models
@@ -82,11 +86,37 @@ class ModelTests(TestCase):
     def test_create_plant(self):
         """Test creating plant is successful."""
         user = create_user()
+        garden = models.Garden.objects.create(user=user, name='garden')
         plant = models.Plant.objects.create(
-            garden_id="123-123-123",
+            garden=garden,
             user=user,
             name="plant",
         )
 
         self.assertEqual(str(plant), plant.name)
         self.assertEqual(len(models.Plant.objects.all()), 1)
+        self.assertEqual(list(garden.plant_set.all()), [plant])
+
+    @override_settings(PLANT_GARDEN_ID_COMPAT=True)
+    def test_plant_legacy_garden_id_in_sync(self):
+        """Test saving a plant keeps the legacy garden id column in sync."""
+        user = create_user()
+        garden = models.Garden.objects.create(user=user, name='garden')
+
+        plant = models.Plant.objects.create(garden=garden, user=user,
+                                            name='plant')
+
+        self.assertEqual(plant.legacy_garden_id, str(garden.id))
+
+    def test_plant_legacy_garden_id_column_kept(self):
+        """Test the string garden_id column of old releases is kept."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT column_name, data_type '
+                'FROM information_schema.columns '
+                "WHERE table_name = 'core_plant' "
+                "AND column_name LIKE 'garden%%'")
+            columns = dict(cursor.fetchall())
+
+        self.assertEqual(columns, {'garden_id': 'character varying',
+                                   'garden_ref_id': 'bigint'})
@@ -0,0 +1,153 @@
+"""
+Tests for the query plans of hot queries.
+"""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import (
+    IntegrityError,
+    connection,
+)
+from django.test import TestCase
+
+from rest_framework.exceptions import ValidationError
+
+from core.models import (
+    Contract,
+    Garden,
+    Plant,
+)
+
+from contract.serializers import ContractSerializer
+
+
+def query_plan(queryset):
+    """Return the EXPLAIN plan of queryset with sequential scans disabled.
+
+    With enable_seqscan off the planner still falls back to a sequential
+    scan when no index can serve the query, which is what the tests
+    detect.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        return cursor.fetchone()[0][0]['Plan']
+
+
+def plan_nodes(plan):
+    """Yield every node of plan."""
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def index_exists(name):
+    """Return whether index with name exists."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM pg_indexes WHERE indexname = %s',
+                       [name])
+        return cursor.fetchone() is not None
+
+
+class QueryPlanTests(TestCase):
+    """Test hot queries are served by indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = get_user_model().objects.bulk_create([
+            get_user_model()(email=f'user{i}@example.com')
+            for i in range(20)
+        ])
+        Contract.objects.bulk_create([
+            Contract(user=user, name=f'contract {i}', id=uuid.uuid4())
+            for user in users for i in range(50)
+        ])
+        Garden.objects.bulk_create([
+            Garden(user=user, name=f'garden {i}')
+            for user in users for i in range(50)
+        ])
+        Plant.objects.bulk_create([
+            Plant(user=user, name=f'plant {i}', health=i % 10,
+                  has_plant=i % 20 != 0)
+            for user in users for i in range(200)
+        ])
+        with connection.cursor() as cursor:
+            for model in (get_user_model(), Contract, Garden, Plant):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+        cls.user = users[0]
+
+    def assertIndexScan(self, queryset, *models):
+        """Assert queryset reads models through indexes only."""
+        plan = query_plan(queryset)
+        tables = {model._meta.db_table for model in models}
+        for node in plan_nodes(plan):
+            if node['Node Type'] == 'Seq Scan':
+                self.assertNotIn(node['Relation Name'], tables,
+                                 f'sequential scan in plan {plan}')
+
+    def assertUsesIndex(self, queryset, name):
+        """Assert the plan of queryset reads index name."""
+        plan = query_plan(queryset)
+        self.assertIn(name, {node.get('Index Name')
+                             for node in plan_nodes(plan)},
+                      f'{name} not used in plan {plan}')
+
+    def test_contract_list_uses_index(self):
+        """Test listing a user's contracts newest id first."""
+        queryset = Contract.objects.filter(
+            user=self.user).order_by('-id')[:10]
+
+        self.assertUsesIndex(queryset, 'contract_user_id_idx')
+
+    def test_duplicate_contract_name_rejected_by_index(self):
+        """Test duplicate names are rejected by the unique name index."""
+        serializer = ContractSerializer(data={'name': 'CONTRACT 1',
+                                              'level': 1})
+        serializer.is_valid(raise_exception=True)
+
+        with self.assertRaises(ValidationError) as context:
+            serializer.save(user=self.user, provision=False)
+
+        cause = context.exception.__context__
+        self.assertIsInstance(cause, IntegrityError)
+        self.assertEqual(cause.__cause__.diag.constraint_name,
+                         'contract_user_lower_name_uniq')
+
+    def test_garden_list_uses_index(self):
+        """Test listing a user's gardens by name."""
+        queryset = Garden.objects.filter(
+            user=self.user).order_by('-name', '-id')[:10]
+
+        self.assertUsesIndex(queryset, 'garden_user_name_idx')
+
+    def test_garden_name_search_uses_index(self):
+        """Test searching gardens by part of their name."""
+        if not index_exists('garden_name_trgm_idx'):
+            self.skipTest('pg_trgm is not available')
+        queryset = Garden.objects.filter(name__icontains='den 4')
+
+        self.assertIndexScan(queryset, Garden)
+
+    def test_plant_list_uses_index(self):
+        """Test listing a user's plants newest id first."""
+        queryset = Plant.objects.filter(user=self.user).order_by('-id')[:10]
+
+        self.assertUsesIndex(queryset, 'plant_user_id_idx')
+
+    def test_empty_plant_list_uses_index(self):
+        """Test listing a user's plants without a plant."""
+        queryset = Plant.objects.filter(
+            user=self.user, has_plant=False).order_by('-id')[:10]
+
+        self.assertUsesIndex(queryset, 'plant_user_empty_idx')
+
+    def test_plant_health_range_uses_index(self):
+        """Test filtering a user's plants by a health range."""
+        queryset = Plant.objects.filter(user=self.user, health__lt=1)
+
+        self.assertUsesIndex(queryset, 'plant_user_health_idx')
+
+    def test_contract_names_unique_per_user(self):
+        """Test contract names are unique per user ignoring case."""
+        self.assertTrue(index_exists('contract_user_lower_name_uniq'))
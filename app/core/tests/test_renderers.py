@@ -0,0 +1,103 @@
+"""
+Tests for the JSON renderer and parser.
+"""
+import datetime
+import decimal
+import io
+import uuid
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+PAYLOADS = [
+    {'id': uuid.UUID('8d060465-0511-4b2a-96f3-58a78ca135c5'), 'level': 3},
+    {'floats': [0.1, 1.0, -0.0, 1e-4, 9.9e-5, 1e-5, 1.5e-7, 1e15, 1e16,
+                1.2345678901234568e+16, 5e-324, 1.7976931348623157e308]},
+    {'name': 'line paragraph  \x00\x1f\x7f "quoted" \\ é 🌱'},
+    {'uuid-like': 'e1', 'exponent-like': 'x1e5,'},
+    {'created_at': datetime.datetime(2023, 2, 21, 18, 39, 1, 123456,
+                                     tzinfo=datetime.timezone.utc),
+     'date': datetime.date(2023, 2, 21), 'time': datetime.time(18, 39, 1),
+     'decimal': decimal.Decimal('1.25')},
+    {'big': 2 ** 70, 1: 'int key'},
+    [{'nested': [[], {}, None, True, False]}],
+]
+
+
+class RendererTests(SimpleTestCase):
+    """Test FastJSONRenderer renders the bytes of JSONRenderer."""
+
+    def test_same_bytes(self):
+        """Test payloads render the same as with JSONRenderer."""
+        for data in PAYLOADS:
+            with self.subTest(data=data):
+                self.assertEqual(FastJSONRenderer().render(data),
+                                 JSONRenderer().render(data))
+
+    def test_indent(self):
+        """Test indented output is rendered by JSONRenderer."""
+        self.assertEqual(
+            FastJSONRenderer().render(
+                PAYLOADS[0], 'application/json; indent=4'),
+            JSONRenderer().render(PAYLOADS[0], 'application/json; indent=4'))
+
+    def test_none(self):
+        """Test no data renders no content."""
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    @patch('core.renderers.orjson', None)
+    def test_without_orjson(self):
+        """Test the json module is used when orjson is missing."""
+        self.assertEqual(FastJSONRenderer().render(PAYLOADS[0]),
+                         JSONRenderer().render(PAYLOADS[0]))
+
+
+class ParserTests(SimpleTestCase):
+    """Test FastJSONParser parses like JSONParser."""
+
+    def parse(self, parser, content, encoding='utf-8'):
+        return parser.parse(io.BytesIO(content), 'application/json',
+                            {'encoding': encoding})
+
+    def assertSameResult(self, content, encoding='utf-8'):
+        results = []
+        for parser in (FastJSONParser(), JSONParser()):
+            try:
+                results.append(self.parse(parser, content, encoding))
+            except ParseError as error:
+                results.append(('error', str(error.detail)))
+        self.assertEqual(results[0], results[1])
+        return results[0]
+
+    def test_same_result(self):
+        """Test bodies parse to the same data."""
+        for content in (
+                b'{"plants": [{"id": 1, "health": 0.1}, {"id": 2}]}',
+                b'{"a": 1, "a": 2}',
+                b'[1.0e2, 1E5, -0, 1e-400, 1e400]',
+                b'[123456789012345678901234567890]',
+                b'[18446744073709551616, -9223372036854775809]',
+                '{"name": "é 🌱"}'.encode()):
+            with self.subTest(content=content):
+                self.assertSameResult(content)
+
+    def test_same_errors(self):
+        """Test invalid bodies fail with the same errors."""
+        for content in (b'{"a": ', b'[NaN]', b'{"a": Infinity}', b'\xff'):
+            with self.subTest(content=content):
+                result = self.assertSameResult(content)
+                self.assertEqual(result[0], 'error')
+
+    def test_other_encoding(self):
+        """Test bodies in other encodings are parsed by JSONParser."""
+        content = '{"name": "é"}'.encode('latin-1')
+
+        self.assertEqual(self.assertSameResult(content, 'latin-1'),
+                         {'name': 'é'})
@@ -0,0 +1,35 @@
+"""
+Views for the core app.
+"""
+import hmac
+
+from django.conf import settings
+from django.http import (
+    HttpResponse,
+    HttpResponseForbidden,
+)
+from django.views.decorators.http import require_GET
+
+from core.metrics import registry
+
+
+def may_scrape(request):
+    """Return whether request may read the metrics."""
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    if not settings.METRICS_TOKEN:
+        return False
+    return hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''),
+        f'Bearer {settings.METRICS_TOKEN}')
+
+
+@require_GET
+def metrics(request):
+    """Return the metrics of all workers in Prometheus text format."""
+    if not may_scrape(request):
+        return HttpResponseForbidden()
+    registry.check_process()
+    return HttpResponse(registry.exposition(),
+                        content_type='text/plain; version=0.0.4; '
+                                     'charset=utf-8')
@@ -0,0 +1,263 @@
+"""
+Batch ingestion of plant readings.
+"""
+import csv
+import io
+import json
+import logging
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from psycopg2 import (
+    DataError as Psycopg2DataError,
+    IntegrityError as Psycopg2IntegrityError,
+)
+
+from django.conf import settings
+from django.db import (
+    DataError,
+    IntegrityError,
+    connection,
+    transaction,
+)
+from django.utils import timezone
+
+from core.models import (
+    PLANT_MEASURED_FIELDS,
+    Plant,
+    PlantReading,
+)
+
+COPY_COLUMNS = ('plant_id', 'recorded_at') + PLANT_MEASURED_FIELDS
+LATEST_VALUES_CHUNK_SIZE = 1000
+
+# Timestamps are validated by PostgreSQL during COPY, this only keeps
+# characters that could break the COPY text format out of the stream.
+TIMESTAMP_RE = re.compile(r'[0-9T:.+\-Z ]+')
+
+logger = logging.getLogger(__name__)
+
+
+class ReadingError(ValueError):
+    """Raised when a batch of readings cannot be ingested."""
+
+
+class ReadingBatch:
+    """Readings of one request encoded in PostgreSQL COPY text format."""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.plant_ids = set()
+        self.count = 0
+        self.received_at = timezone.now().isoformat()
+
+    def add(self, line_number, plant, recorded_at, values):
+        """Validate one reading and append it to the batch."""
+        try:
+            plant_id = int(plant)
+        except (TypeError, ValueError):
+            raise ReadingError(f'line {line_number}: invalid plant {plant!r}')
+        if not recorded_at:
+            recorded_at = self.received_at
+        elif (not isinstance(recorded_at, str) or
+              not TIMESTAMP_RE.fullmatch(recorded_at)):
+            raise ReadingError(
+                f'line {line_number}: invalid recorded_at {recorded_at!r}')
+
+        columns = [str(plant_id), recorded_at]
+        for field, value in zip(PLANT_MEASURED_FIELDS, values):
+            if value is None or value == '':
+                columns.append('\\N')
+                continue
+            kind = type(value)
+            if kind is float or kind is int:
+                number = value
+            elif kind is str:
+                try:
+                    number = float(value)
+                except ValueError:
+                    number = math.nan
+            else:
+                number = math.nan
+            if not math.isfinite(number):
+                raise ReadingError(
+                    f'line {line_number}: invalid {field} {value!r}')
+            columns.append(repr(float(number)))
+
+        self.buffer.write('\t'.join(columns))
+        self.buffer.write('\n')
+        self.plant_ids.add(plant_id)
+        self.count += 1
+
+
+def parse_ndjson(text):
+    """Return batch of readings from newline delimited JSON objects."""
+    batch = ReadingBatch()
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            reading = json.loads(line)
+        except ValueError:
+            raise ReadingError(f'line {line_number}: invalid JSON')
+        if not isinstance(reading, dict):
+            raise ReadingError(f'line {line_number}: expected an object')
+        batch.add(line_number, reading.get('plant'),
+                  reading.get('recorded_at'),
+                  [reading.get(field) for field in PLANT_MEASURED_FIELDS])
+    return batch
+
+
+def parse_csv(text):
+    """Return batch of readings from CSV with a header row."""
+    batch = ReadingBatch()
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if header is None:
+        return batch
+    header = [column.strip() for column in header]
+    unknown = set(header) - {'plant', 'recorded_at', *PLANT_MEASURED_FIELDS}
+    if unknown or 'plant' not in header:
+        raise ReadingError(f'invalid CSV header {header!r}')
+
+    positions = {column: position for position, column in enumerate(header)}
+    plant_position = positions['plant']
+    time_position = positions.get('recorded_at')
+    field_positions = [positions.get(field) for field in PLANT_MEASURED_FIELDS]
+    for line_number, row in enumerate(reader, start=2):
+        if not row:
+            continue
+        if len(row) != len(header):
+            raise ReadingError(f'line {line_number}: expected '
+                               f'{len(header)} columns')
+        batch.add(
+            line_number,
+            row[plant_position],
+            row[time_position] if time_position is not None else None,
+            [row[position] if position is not None else None
+             for position in field_positions],
+        )
+    return batch
+
+
+def copy_readings(batch):
+    """Load batch into the readings table with COPY.
+
+    The deferred plant foreign key is checked right away, so readings of
+    plants deleted since the ownership check fail here rather than on
+    commit.
+    """
+    batch.buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {PlantReading._meta.db_table} '
+            f'({", ".join(COPY_COLUMNS)}) FROM STDIN',
+            batch.buffer,
+        )
+    connection.check_constraints()
+
+
+def ingest_readings(user, batch):
+    """Store batch of readings of plants owned by user.
+
+    The latest values on the plants are refreshed in the background once
+    the readings are committed. An empty body, which DRF does not pass to
+    the parsers, is rejected like an empty batch.
+    """
+    if not isinstance(batch, ReadingBatch) or not batch.count:
+        raise ReadingError('no readings')
+
+    owned = Plant.objects.filter(user=user, id__in=batch.plant_ids)
+    if owned.count() != len(batch.plant_ids):
+        missing = batch.plant_ids - set(owned.values_list('id', flat=True))
+        raise ReadingError(f'plants not found: {sorted(missing)}')
+
+    try:
+        with transaction.atomic():
+            copy_readings(batch)
+    except (Psycopg2DataError, DataError) as error:
+        raise ReadingError(str(error).strip())
+    except (Psycopg2IntegrityError, IntegrityError):
+        raise ReadingError('plants were deleted during ingestion')
+
+    plant_ids = batch.plant_ids
+    transaction.on_commit(lambda: latest_values.mark_dirty(plant_ids))
+    return batch.count
+
+
+def update_latest_values(plant_ids):
+    """Copy the newest reading of every plant onto the plant row.
+
+    Only metrics change, so garden and contract versions stay the same.
+    """
+    plant_table = Plant._meta.db_table
+    reading_table = PlantReading._meta.db_table
+    assignments = ', '.join(
+        f'{field} = COALESCE(latest.{field}, plant.{field})'
+        for field in PLANT_MEASURED_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {plant_table} AS plant SET {assignments}, '
+            f'updated_at = now() '
+            f'FROM (SELECT DISTINCT ON (plant_id) plant_id, '
+            f'{", ".join(PLANT_MEASURED_FIELDS)} FROM {reading_table} '
+            f'WHERE plant_id = ANY(%s) '
+            f'ORDER BY plant_id, recorded_at DESC) AS latest '
+            f'WHERE plant.id = latest.plant_id',
+            [list(plant_ids)],
+        )
+
+
+class LatestValueUpdater:
+    """Coalesce plants with new readings and update them in batches."""
+
+    def __init__(self):
+        self._pending = set()
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def mark_dirty(self, plant_ids):
+        """Queue plants for an update on the background thread."""
+        with self._lock:
+            self._pending.update(plant_ids)
+            if self._scheduled:
+                return
+            self._scheduled = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='telemetry')
+        self._executor.submit(self._run)
+
+    def _run(self):
+        time.sleep(settings.TELEMETRY_FLUSH_DELAY)
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('updating latest plant values failed')
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Update the latest values of all queued plants now.
+
+        Plants not updated when an update fails are queued again.
+        """
+        with self._lock:
+            plant_ids = sorted(self._pending)
+            self._pending = set()
+            self._scheduled = False
+        for start in range(0, len(plant_ids), LATEST_VALUES_CHUNK_SIZE):
+            try:
+                update_latest_values(
+                    plant_ids[start:start + LATEST_VALUES_CHUNK_SIZE])
+            except Exception:
+                self.mark_dirty(plant_ids[start:])
+                raise
+        return len(plant_ids)
+
+
+latest_values = LatestValueUpdater()
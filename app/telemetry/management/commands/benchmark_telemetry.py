@@ -0,0 +1,102 @@
+"""
+Django command to benchmark plant reading ingestion.
+"""
+import json
+import random
+import time
+import uuid
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import (
+    PLANT_MEASURED_FIELDS,
+    Plant,
+    PlantReading,
+)
+
+from telemetry.ingestion import (
+    ingest_readings,
+    parse_csv,
+    parse_ndjson,
+    update_latest_values,
+)
+
+
+class Command(BaseCommand):
+    help = ('Ingest generated readings into the configured database and '
+            'report readings per second. Everything created is removed '
+            'afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readings', type=int, default=100000)
+        parser.add_argument('--plants', type=int, default=1000)
+        parser.add_argument('--format', choices=['ndjson', 'csv'],
+                            default='ndjson')
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(
+            f'benchmark-{uuid.uuid4().hex}@example.com')
+        try:
+            plants = Plant.objects.bulk_create([
+                Plant(user=user, name=f'plant {i}')
+                for i in range(options['plants'])
+            ])
+            body = self.generate(
+                [plant.id for plant in plants], options['readings'],
+                options['format'])
+            self.run(user, plants, body, options)
+        finally:
+            user.delete()
+
+    def generate(self, plant_ids, count, body_format):
+        """Return request body with count random readings."""
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        readings = []
+        for i in range(count):
+            reading = {
+                'plant': random.choice(plant_ids),
+                'recorded_at': (start + timedelta(seconds=i)).isoformat(),
+            }
+            for field in PLANT_MEASURED_FIELDS:
+                reading[field] = round(random.uniform(0, 100), 2)
+            readings.append(reading)
+
+        if body_format == 'ndjson':
+            return '\n'.join(json.dumps(reading) for reading in readings)
+        columns = ['plant', 'recorded_at', *PLANT_MEASURED_FIELDS]
+        lines = [','.join(columns)]
+        lines += [','.join(str(reading[column]) for column in columns)
+                  for reading in readings]
+        return '\n'.join(lines)
+
+    def run(self, user, plants, body, options):
+        parse = parse_ndjson if options['format'] == 'ndjson' else parse_csv
+
+        started = time.perf_counter()
+        batch = parse(body)
+        parsed = time.perf_counter()
+        with transaction.atomic():
+            count = ingest_readings(user, batch)
+        loaded = time.perf_counter()
+        update_latest_values([plant.id for plant in plants])
+        updated = time.perf_counter()
+
+        stored = PlantReading.objects.filter(plant__user=user).count()
+        self.stdout.write(f'readings: {count} ({stored} stored)')
+        for label, seconds in [
+            ('parse', parsed - started),
+            ('copy', loaded - parsed),
+            ('ingest', loaded - started),
+        ]:
+            self.stdout.write(
+                f'{label}: {seconds:.3f}s, {count / seconds:,.0f} readings/s')
+        self.stdout.write(
+            f'latest values of {len(plants)} plants: '
+            f'{updated - loaded:.3f}s')
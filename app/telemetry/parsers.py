@@ -0,0 +1,37 @@
+"""
+Parsers for batches of plant readings.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+from telemetry.ingestion import (
+    ReadingError,
+    parse_csv,
+    parse_ndjson,
+)
+
+
+class ReadingParser(BaseParser):
+    """Parse request body into a batch of readings."""
+    parse_readings = None
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            text = stream.read().decode('utf-8')
+            return self.parse_readings(text)
+        except UnicodeDecodeError:
+            raise ParseError('readings must be UTF-8 encoded')
+        except ReadingError as error:
+            raise ParseError(str(error))
+
+
+class NDJSONReadingParser(ReadingParser):
+    """Parse newline delimited JSON readings."""
+    media_type = 'application/x-ndjson'
+    parse_readings = staticmethod(parse_ndjson)
+
+
+class CSVReadingParser(ReadingParser):
+    """Parse CSV readings."""
+    media_type = 'text/csv'
+    parse_readings = staticmethod(parse_csv)
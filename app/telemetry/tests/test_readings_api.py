@@ -0,0 +1,237 @@
+"""
+Tests for the plant readings ingestion API.
+"""
+import json
+from unittest.mock import (
+    Mock,
+    patch,
+)
+
+from django.contrib.auth import get_user_model
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Plant,
+    PlantReading,
+)
+
+from telemetry import ingestion
+from telemetry.ingestion import (
+    LatestValueUpdater,
+    ReadingError,
+    parse_csv,
+    update_latest_values,
+)
+
+READINGS_URL = reverse('telemetry:readings')
+
+
+def create_user(email='user@example.com', password='testpass123'):
+    """Create and return user."""
+    return get_user_model().objects.create_user(email, password)
+
+
+def create_plant(user, **params):
+    """Create and return plant."""
+    defaults = {
+        'name': 'plant',
+    }
+    defaults.update(params)
+
+    return Plant.objects.create(user=user, **defaults)
+
+
+def ndjson(readings):
+    """Return readings encoded as newline delimited JSON."""
+    return '\n'.join(json.dumps(reading) for reading in readings)
+
+
+class PublicReadingsApiTests(TestCase):
+    """Test unauthenticated API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required for ingesting readings."""
+        response = self.client.post(READINGS_URL, '',
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateReadingsApiTests(TestCase):
+    """Test authenticated API requests."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.plant = create_plant(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_ingest_ndjson_readings(self):
+        """Test ingesting newline delimited JSON readings."""
+        readings = [
+            {'plant': self.plant.id, 'recorded_at': '2023-03-01T10:00:00Z',
+             'health': 0.5, 'soil_moisture_percentage': 30},
+            {'plant': self.plant.id, 'recorded_at': '2023-03-01T11:00:00Z',
+             'insects_per_meter': 2},
+        ]
+
+        response = self.client.post(READINGS_URL, ndjson(readings),
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['ingested'], 2)
+        stored = PlantReading.objects.filter(
+            plant=self.plant).order_by('recorded_at')
+        self.assertEqual(stored.count(), 2)
+        self.assertEqual(stored[0].health, 0.5)
+        self.assertEqual(stored[0].soil_moisture_percentage, 30)
+        self.assertIsNone(stored[0].insects_per_meter)
+        self.assertEqual(stored[1].insects_per_meter, 2)
+
+    def test_ingest_csv_readings(self):
+        """Test ingesting CSV readings."""
+        body = (
+            'plant,recorded_at,health,disease\n'
+            f'{self.plant.id},2023-03-01T10:00:00Z,0.7,\n'
+            f'{self.plant.id},,0.8,0.1\n'
+        )
+
+        response = self.client.post(READINGS_URL, body,
+                                    content_type='text/csv')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['ingested'], 2)
+        self.assertEqual(
+            sorted(PlantReading.objects.values_list('health', flat=True)),
+            [0.7, 0.8])
+
+    def test_ingest_other_user_plant_rejected(self):
+        """Test readings for plants of other users are rejected."""
+        other_plant = create_plant(user=create_user('other@example.com'))
+        readings = [{'plant': self.plant.id, 'health': 1},
+                    {'plant': other_plant.id, 'health': 1}]
+
+        response = self.client.post(READINGS_URL, ndjson(readings),
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PlantReading.objects.exists())
+
+    def test_ingest_invalid_value_rejected(self):
+        """Test a non numeric metric rejects the batch."""
+        readings = [{'plant': self.plant.id, 'health': 'good'}]
+
+        response = self.client.post(READINGS_URL, ndjson(readings),
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PlantReading.objects.exists())
+
+    def test_ingest_invalid_timestamp_rejected(self):
+        """Test a timestamp PostgreSQL cannot parse rejects the batch."""
+        readings = [{'plant': self.plant.id, 'recorded_at': '2023-13-45',
+                     'health': 1}]
+
+        response = self.client.post(READINGS_URL, ndjson(readings),
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PlantReading.objects.exists())
+
+    def test_ingest_empty_body_rejected(self):
+        """Test empty bodies of either format are rejected."""
+        for content_type in ('application/x-ndjson', 'text/csv'):
+            with self.subTest(content_type=content_type):
+                response = self.client.post(READINGS_URL, '',
+                                            content_type=content_type)
+
+                self.assertEqual(response.status_code,
+                                 status.HTTP_400_BAD_REQUEST)
+
+    def test_ingest_deleted_plant_rejected(self):
+        """Test a plant deleted before the COPY rejects the batch."""
+        copy_readings = ingestion.copy_readings
+
+        def delete_plant_and_copy(batch):
+            Plant.objects.filter(id=self.plant.id).delete()
+            copy_readings(batch)
+
+        with patch('telemetry.ingestion.copy_readings',
+                   delete_plant_and_copy):
+            response = self.client.post(
+                READINGS_URL, ndjson([{'plant': self.plant.id}]),
+                content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('deleted', str(response.data))
+
+    def test_latest_values_updated_from_newest_reading(self):
+        """Test plants take the metrics of their newest reading."""
+        readings = [
+            {'plant': self.plant.id, 'recorded_at': '2023-03-01T11:00:00Z',
+             'health': 0.9},
+            {'plant': self.plant.id, 'recorded_at': '2023-03-01T10:00:00Z',
+             'health': 0.1, 'disease': 0.3},
+        ]
+        self.client.post(READINGS_URL, ndjson(readings),
+                         content_type='application/x-ndjson')
+
+        update_latest_values([self.plant.id])
+
+        self.plant.refresh_from_db()
+        self.assertEqual(self.plant.health, 0.9)
+        self.assertEqual(self.plant.disease, 0)
+
+    @patch('telemetry.ingestion.latest_values')
+    def test_latest_values_queued_on_commit(self, patched_latest_values):
+        """Test plants are queued for the latest values update on commit."""
+        readings = [{'plant': self.plant.id, 'health': 0.9}]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(READINGS_URL, ndjson(readings),
+                             content_type='application/x-ndjson')
+
+        patched_latest_values.mark_dirty.assert_called_once_with(
+            {self.plant.id})
+
+
+class ParseReadingsTests(SimpleTestCase):
+    """Test parsing batches of readings."""
+
+    def test_parse_csv_unknown_column_rejected(self):
+        """Test CSV with an unknown column is rejected."""
+        with self.assertRaises(ReadingError):
+            parse_csv('plant,colour\n1,green\n')
+
+    def test_parse_csv_control_characters_rejected(self):
+        """Test timestamps cannot inject into the COPY stream."""
+        with self.assertRaises(ReadingError):
+            parse_csv('plant,recorded_at\n1,"2023-03-01\t1"\n')
+
+
+class LatestValueUpdaterTests(SimpleTestCase):
+    """Test the background updates of latest values."""
+
+    @patch('telemetry.ingestion.update_latest_values',
+           side_effect=RuntimeError)
+    def test_failed_update_queued_again(self, patched_update):
+        """Test plants of a failed update are queued for the next run."""
+        updater = LatestValueUpdater()
+        updater._executor = Mock()
+        updater.mark_dirty({1, 2})
+
+        with self.assertRaises(RuntimeError):
+            updater.flush()
+
+        self.assertEqual(updater._pending, {1, 2})
+        self.assertEqual(updater._executor.submit.call_count, 2)
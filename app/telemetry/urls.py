@@ -0,0 +1,12 @@
+"""
+URL mappings for the telemetry APIs.
+"""
+from django.urls import path
+
+from telemetry import views
+
+app_name = 'telemetry'
+
+urlpatterns = [
+    path('readings/', views.ReadingIngestView.as_view(), name='readings'),
+]
@@ -0,0 +1,36 @@
+"""
+Views for the telemetry APIs.
+"""
+from rest_framework import (
+    status,
+    views,
+)
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from telemetry.ingestion import (
+    ReadingError,
+    ingest_readings,
+)
+from telemetry.parsers import (
+    CSVReadingParser,
+    NDJSONReadingParser,
+)
+from user.authentication import CachedTokenAuthentication
+
+
+class ReadingIngestView(views.APIView):
+    """Ingest a batch of plant readings."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [NDJSONReadingParser, CSVReadingParser]
+
+    def post(self, request):
+        try:
+            count = ingest_readings(request.user, request.data)
+        except ReadingError as error:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [str(error)]})
+        return Response({'ingested': count}, status=status.HTTP_201_CREATED)
@@ -0,0 +1,128 @@
+"""
+Authentication for the APIs.
+"""
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from rest_framework.authentication import TokenAuthentication
+
+from core.instrumentation import span
+from core.metrics import Callback
+
+
+class TokenCache:
+    """Cache of token key to authenticated user and token.
+
+    Entries are kept in the shared cache with the generation of their user,
+    read before the lookup went to the database. Invalidating a user
+    deletes the generation, so every process ignores the entries stored
+    before, including those of lookups that were in flight. Tokens have
+    their user recorded when they are created or first looked up, lookups
+    are cached from then on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[settings.TOKEN_AUTH_CACHE['CACHE_ALIAS']]
+
+    def reset(self):
+        """Reset the hit and miss counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def _user_key(self, key):
+        return f'token-auth:{key}:user'
+
+    def _entry_key(self, key):
+        return f'token-auth:{key}:entry'
+
+    def _generation_key(self, user_id):
+        return f'token-auth:user:{user_id}:generation'
+
+    def user_id(self, key):
+        """Return the recorded user id of token key or None."""
+        return self.cache.get(self._user_key(key))
+
+    def remember_user(self, key, user_id):
+        """Record the user of token key."""
+        self.cache.set(self._user_key(key), user_id, None)
+
+    def get(self, key, user_id):
+        """Return the generation of user and the cached lookup or None."""
+        entry_key = self._entry_key(key)
+        generation_key = self._generation_key(user_id)
+        values = self.cache.get_many([entry_key, generation_key])
+        generation = values.get(generation_key)
+        if generation is None:
+            self.cache.add(generation_key, uuid.uuid4().hex, None)
+            generation = self.cache.get(generation_key)
+        entry = values.get(entry_key)
+        if entry is not None and entry[0] != generation:
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return generation, None if entry is None else entry[1:]
+
+    def set(self, key, generation, user, token):
+        self.cache.set(self._entry_key(key), (generation, user, token),
+                       settings.TOKEN_AUTH_CACHE['TIMEOUT'])
+
+    def invalidate_user(self, user_id):
+        """Invalidate the cached lookups of user, now and on commit."""
+        key = self._generation_key(user_id)
+        self.cache.delete(key)
+        transaction.on_commit(lambda: self.cache.delete(key))
+
+    def stats(self):
+        """Return hit and miss counters."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+token_cache = TokenCache()
+
+
+def cache_requests():
+    stats = token_cache.stats()
+    return {('hit',): stats['hits'], ('miss',): stats['misses']}
+
+
+Callback('token_cache_requests', 'Token cache lookups by result.',
+         ['result'], cache_requests, kind='counter')
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication caching the token lookup in the shared cache.
+
+    Entries are invalidated in every process when the token is deleted or
+    the user is saved or deleted, and expire after
+    TOKEN_AUTH_CACHE['TIMEOUT'] seconds otherwise.
+    """
+
+    def authenticate_credentials(self, key):
+        with span('auth'):
+            user_id = token_cache.user_id(key)
+            if user_id is not None:
+                generation, cached = token_cache.get(key, user_id)
+                if cached is not None:
+                    return cached
+
+            user, token = super().authenticate_credentials(key)
+            if user_id is None:
+                token_cache.remember_user(key, user.id)
+            elif user_id == user.id:
+                token_cache.set(key, generation, user, token)
+            return user, token
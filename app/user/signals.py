@@ -0,0 +1,33 @@
+"""
+Signal handlers invalidating cached token lookups.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+)
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from user.authentication import token_cache
+
+
+@receiver(post_save, sender=Token)
+def remember_token_user(sender, instance, created, **kwargs):
+    """Record the user of a new token so its first lookup is cached."""
+    if created:
+        token_cache.remember_user(instance.key, instance.user_id)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    """Invalidate the cached lookups of the user of a deleted token."""
+    token_cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, **kwargs):
+    """Invalidate the cached lookups of a changed or deleted user."""
+    token_cache.invalidate_user(instance.id)
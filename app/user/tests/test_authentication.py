@@ -0,0 +1,118 @@
+"""
+Tests for cached token authentication.
+"""
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from user.authentication import (
+    TokenCache,
+    token_cache,
+)
+
+
+ME_URL = reverse('user:me')
+
+
+def create_user(**params):
+    """Create and return new user"""
+    return get_user_model().objects.create_user(**params)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating requests with cached token lookups."""
+
+    def setUp(self):
+        token_cache.reset()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='Test Name'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_cached(self):
+        """Test repeated requests do not query the token again."""
+        with self.assertNumQueries(1):
+            response = self.client.get(ME_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email'], self.user.email)
+
+    def test_invalid_token_rejected(self):
+        """Test unknown tokens are still rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_rejected(self):
+        """Test a deleted token stops authenticating."""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test a deactivated user stops authenticating."""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_updated_user_not_stale(self):
+        """Test requests after a profile update see the new data."""
+        self.client.get(ME_URL)
+
+        self.client.patch(ME_URL, {'name': 'Updated name'})
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.data['name'], 'Updated name')
+
+    def test_invalidated_in_other_process(self):
+        """Test an invalidation by another process rejects cached tokens."""
+        self.client.get(ME_URL)
+
+        get_user_model().objects.filter(id=self.user.id).update(
+            is_active=False)
+        TokenCache().invalidate_user(self.user.id)
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_lookup_in_flight_not_cached(self):
+        """Test a lookup overtaken by a deactivation is not served again."""
+        authenticate_credentials = TokenAuthentication.authenticate_credentials
+
+        def deactivated_during_lookup(authentication, key):
+            result = authenticate_credentials(authentication, key)
+            get_user_model().objects.filter(id=self.user.id).update(
+                is_active=False)
+            TokenCache().invalidate_user(self.user.id)
+            return result
+
+        with patch.object(TokenAuthentication, 'authenticate_credentials',
+                          deactivated_during_lookup):
+            self.client.get(ME_URL)
+        response = self.client.get(ME_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)